@@ -39,33 +39,63 @@ edges = [
 ]
 G.add_weighted_edges_from(edges)
 
+# 🔹 ตารางระยะทางระหว่างจุด (Dijkstra ครั้งเดียวต่อโหนด)
+class DistanceMatrix:
+    def __init__(self, graph, nodes):
+        self.nodes = list(dict.fromkeys(nodes))
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.dist = []
+        self.pred = []
+
+        # one single-source search per relevant node, kept as a dense row
+        for source in self.nodes:
+            pred, dist = nx.dijkstra_predecessor_and_distance(graph, source, weight="weight")
+            self.dist.append([dist.get(target, float("inf")) for target in self.nodes])
+            self.pred.append(pred)
+
+    # เส้นทางจริงของช่วง u → v จากตาราง predecessor
+    def leg_path(self, u, v):
+        pred = self.pred[self.index[u]]
+        path = [v]
+        while path[-1] != u:
+            path.append(pred[path[-1]][0])
+        path.reverse()
+        return path
+
+    # ประกอบเส้นทางเต็มจากลำดับ index ของจุดแวะ
+    def build_path(self, order):
+        path = [self.nodes[order[0]]]
+        for a, b in zip(order, order[1:]):
+            path.extend(self.leg_path(self.nodes[a], self.nodes[b])[1:])
+        return path
+
+
 # 🔹 ฟังก์ชันหาเส้นทางที่ดีที่สุด
 
 def find_best_shortest_path(start, destinations):
-    if len(destinations) == 1:
-        end = destinations[0]
-        path = nx.shortest_path(G, source=start, target=end, weight="weight")
-        distance = nx.shortest_path_length(G, source=start, target=end, weight="weight")
-        return path, distance
-    
-    best_path, best_distance = None, float("inf")
+    matrix = DistanceMatrix(G, [start, *destinations])
+    dist = matrix.dist
+    first = matrix.index[start]
+    stops = [matrix.index[dest] for dest in destinations]
 
-    for perm in permutations(destinations):
-        path = [start]
+    best_order, best_distance = None, float("inf")
+
+    # the search loop only adds up numbers; the full path is built once at the end
+    for perm in permutations(stops):
         total_distance = 0
-        current_location = start
+        current_location = first
 
         for next_stop in perm:
-            sub_path = nx.shortest_path(G, source=current_location, target=next_stop, weight="weight")
-            sub_distance = nx.shortest_path_length(G, source=current_location, target=next_stop, weight="weight")
-            path.extend(sub_path[1:])
-            total_distance += sub_distance
+            total_distance += dist[current_location][next_stop]
             current_location = next_stop
 
         if total_distance < best_distance:
-            best_distance, best_path = total_distance, path
+            best_distance, best_order = total_distance, perm
+
+    if best_order is None:
+        raise nx.NetworkXNoPath(f"No path from {start} to {', '.join(destinations)}")
 
-    return best_path, best_distance
+    return matrix.build_path([first, *best_order]), best_distance
 
 # Function to split text into lines if it exceeds a certain length
 def wrap_text(text, max_length=100):
@@ -0,0 +1,101 @@
+"""
+คำนวณเส้นทางคาเฟ่แบบกลุ่ม: อ่านคำขอ JSONL จากไฟล์หรือ stdin แล้วเขียนผลลัพธ์ทีละบรรทัดเมื่อคำนวณเสร็จ
+
+    python batch_routes.py queries.jsonl -o results.jsonl --images out/
+    echo '{"id": 1, "start": "A", "destinations": ["E", "H"]}' | python batch_routes.py
+
+ผลลัพธ์ไม่เรียงตามลำดับคำขอ ใช้ "id" (หรือเลขบรรทัดถ้าไม่ระบุ) จับคู่
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import cafe_routes
+
+
+def read_queries(lines, errors):
+    # บรรทัดที่อ่านไม่ได้ส่งผลเป็น error ทันที ไม่ส่งต่อให้ solve_many
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            query = json.loads(line)
+            start, destinations = query["start"], query["destinations"]
+            if not isinstance(start, str):
+                raise TypeError("start must be a string")
+            # list("DI") จะกลายเป็น ['D', 'I'] เงียบ ๆ จึงรับเฉพาะ list ของ string
+            if not isinstance(destinations, list) or not all(isinstance(dest, str) for dest in destinations):
+                raise TypeError("destinations must be a list of strings")
+            query_id = query.get("id", number)
+        except (ValueError, KeyError, TypeError) as e:
+            errors({"id": number, "error": f"invalid query: {e}"})
+            continue
+        yield query_id, start, destinations
+
+
+# ชื่อไฟล์ภาพจาก id ของคำขอ: เหลือเฉพาะตัวอักษร/ตัวเลข/._- ไม่ให้ id อย่าง "../x" เขียนนอกโฟลเดอร์
+def image_name(query_id, fmt):
+    name = re.sub(r"[^\w.-]", "_", str(query_id)).lstrip(".")
+    return f"{name or 'query'}.{fmt}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve café route queries from JSONL.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file of queries (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for results (default: stdout)")
+    parser.add_argument("--method", default="auto", choices=["auto", *cafe_routes.SOLVERS])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--window", type=int, default=1000, help="max queries read ahead / in flight")
+    parser.add_argument("--images", help="directory for route images (one per query id)")
+    parser.add_argument("--image-format", default="png", choices=["png", "svg", "pdf"])
+    parser.add_argument("--nodes", default=os.environ.get("CAFE_NODES"))
+    parser.add_argument("--edges", default=os.environ.get("CAFE_EDGES"))
+    parser.add_argument("--snapshot", default=os.environ.get("CAFE_SNAPSHOT"), help="binary graph snapshot (read if fresh, else written)")
+    parser.add_argument("--cache", default=os.environ.get("CAFE_ROUTE_CACHE"), help="SQLite route cache")
+    args = parser.parse_args(argv)
+
+    if args.nodes and args.edges:
+        cafe_routes.load_cafes(args.nodes, args.edges, args.snapshot)
+    if args.cache:
+        cafe_routes.open_route_store(args.cache)
+    if args.images:
+        import newb  # โหลด matplotlib เฉพาะเมื่อต้องทำภาพ
+        os.makedirs(args.images, exist_ok=True)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    def write(result):
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+    # ids เก็บเฉพาะคำขอที่ยังไม่ได้ผล (ลบออกเมื่อเขียนผลแล้ว)
+    ids = {}
+
+    def queries():
+        for i, (query_id, start, destinations) in enumerate(read_queries(source, write)):
+            ids[i] = (query_id, destinations)
+            yield start, destinations
+
+    try:
+        for i, result in cafe_routes.solve_many(queries(), method=args.method, workers=args.workers, window=args.window):
+            query_id, destinations = ids.pop(i)
+            if isinstance(result, Exception):
+                write({"id": query_id, "error": str(result) or type(result).__name__})
+                continue
+            path, distance = result
+            line = {"id": query_id, "path": path, "distance": distance.item() if hasattr(distance, "item") else distance}
+            if args.images:
+                line["image"] = os.path.join(args.images, image_name(query_id, args.image_format))
+                newb.render_route_image(path, distance, destinations, out=line["image"], format=args.image_format)
+            write(line)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+ชุดวัดประสิทธิภาพตัวหาเส้นทาง: สร้างกราฟคาเฟ่/ถนนสังเคราะห์ (กำหนด seed ได้) แล้ววัดเวลา หน่วยความจำ
+และจำนวนการค้นหา Dijkstra ตามจำนวนจุดหมาย บันทึกเป็น JSON และเทียบกับ baseline
+
+    python bench_routes.py --nodes 2000 --degree 4 --stops 3,6,10,20 --output results.json
+    python bench_routes.py --baseline bench_baseline.json --threshold 0.2
+    python bench_routes.py --baseline bench_baseline.json --update-baseline
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import networkx as nx
+import cafe_routes
+from contraction import ContractionHierarchy
+from csr_graph import CSRGraph
+
+
+# 🔹 กราฟสังเคราะห์: จุดสุ่มในพื้นที่ 100x100 ต่อถนนไปยังเพื่อนบ้านที่ใกล้ที่สุด degree จุด
+# ระยะทางบนถนน = ระยะเส้นตรง (ปัดขึ้น) จึงใช้กับ A* ได้ และเชื่อมทุกส่วนให้เป็นกราฟเดียว
+# ชื่อโหนดเป็นสตริงเหมือนข้อมูลที่โหลดจากไฟล์
+def make_graph(nodes=1000, degree=4, cafe_ratio=0.2, seed=0):
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(nodes)]
+
+    # แบ่งเป็นช่องตาราง ให้แต่ละช่องมีจุดประมาณ degree จุด จะได้ไม่ต้องเทียบทุกคู่
+    cell = 100 / max(1, int(math.sqrt(nodes / max(degree, 1))))
+    buckets = {}
+    for i, (x, y) in enumerate(points):
+        buckets.setdefault((int(x // cell), int(y // cell)), []).append(i)
+
+    graph = nx.Graph()
+    for i, (x, y) in enumerate(points):
+        graph.add_node(i, pos=(x, y))
+    for i, (x, y) in enumerate(points):
+        cx, cy = int(x // cell), int(y // cell)
+        near = [j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in buckets.get((cx + dx, cy + dy), ()) if j != i]
+        for j in sorted(near, key=lambda j: math.dist(points[i], points[j]))[:degree]:
+            graph.add_edge(i, j, weight=math.ceil(math.dist(points[i], points[j])) or 1)
+
+    components = sorted(nx.connected_components(graph), key=len, reverse=True)
+    main = list(components[0])
+    for component in components[1:]:
+        u = next(iter(component))
+        v = min(main, key=lambda j: math.dist(points[u], points[j]))
+        graph.add_edge(u, v, weight=math.ceil(math.dist(points[u], points[v])) or 1)
+        main.extend(component)
+
+    for i in rng.sample(range(nodes), max(1, int(nodes * cafe_ratio))):
+        graph.nodes[i]["name"] = f"Cafe {i}"
+    return nx.relabel_nodes(graph, str)
+
+
+# ใช้กราฟสังเคราะห์แทนข้อมูลคาเฟ่ใน cafe_routes (เหมือน load_cafes)
+def use_graph(graph, backend="nx"):
+    cafe_routes.use_contraction_hierarchy(enabled=False)
+    cafe_routes.use_csr_backend(False)
+    cafe_routes.set_graph(graph)
+    if backend == "csr":
+        cafe_routes.use_csr_backend()
+    if backend == "ch":
+        cafe_routes.use_contraction_hierarchy()
+
+
+# 🔹 นับจำนวนการค้นหาแบบ single-source / สองทิศ / upward search ของ CH ระหว่างวัด
+@contextmanager
+def count_searches():
+    counts = {"calls": 0}
+    patched = []
+
+    def wrap(owner, name, counted=None):
+        original = getattr(owner, name)
+
+        def wrapper(*args, **kwargs):
+            if counted is None or counted(*args):
+                counts["calls"] += 1
+            return original(*args, **kwargs)
+
+        setattr(owner, name, wrapper)
+        patched.append((owner, name, original))
+
+    wrap(nx, "dijkstra_predecessor_and_distance")
+    wrap(nx, "bidirectional_dijkstra")
+    wrap(nx, "astar_path")
+    wrap(CSRGraph, "dijkstra")
+    wrap(CSRGraph, "bidirectional")
+    wrap(ContractionHierarchy, "search_space", lambda self, u: u not in self._spaces)
+    try:
+        yield counts
+    finally:
+        for owner, name, original in reversed(patched):
+            setattr(owner, name, original)
+
+
+def make_queries(graph, stops, count, seed=0):
+    rng = random.Random(seed * 1000 + stops)
+    cafes = sorted(n for n, data in graph.nodes(data=True) if "name" in data)
+    nodes = list(graph.nodes())
+    return [(rng.choice(nodes), rng.sample(cafes, min(stops, len(cafes)))) for _ in range(count)]
+
+
+def reset_caches(warm):
+    cafe_routes.route_cache.invalidate()
+    if not warm:
+        cafe_routes.leg_cache.invalidate()
+        if cafe_routes.contraction_hierarchy is not None:
+            cafe_routes.contraction_hierarchy._spaces.clear()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+# วัดหนึ่งชุด (method, จำนวนจุดหมาย): เวลาแต่ละคำขอ + จำนวนการค้นหา แล้ววัดหน่วยความจำสูงสุดแยกอีกรอบ
+# (tracemalloc ทำให้ช้าลง จึงไม่วัดพร้อมเวลา และไม่รวมหน่วยความจำของ process ลูก)
+def run_case(queries, method, warm=False, options=None):
+    options = options or {}
+    latencies = []
+    with count_searches() as counts:
+        for start, destinations in queries:
+            reset_caches(warm)
+            began = time.perf_counter()
+            cafe_routes.find_best_shortest_path(start, destinations, method=method, use_cache=False, **options)
+            latencies.append(time.perf_counter() - began)
+
+    tracemalloc.start()
+    for start, destinations in queries[:3]:
+        reset_caches(warm)
+        cafe_routes.find_best_shortest_path(start, destinations, method=method, use_cache=False, **options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "method": method,
+        "stops": len(queries[0][1]),
+        "queries": len(queries),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_kb": peak / 1024,
+        "searches_per_query": counts["calls"] / len(queries),
+    }
+
+
+# เวลาวาดเส้นทางหนึ่งเส้น (โหลด newb/matplotlib เฉพาะเมื่อขอวัด)
+def run_draw(queries, repeat=3):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import newb
+
+    start, destinations = queries[0]
+    path, distance = cafe_routes.find_best_shortest_path(start, destinations)
+    latencies = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        newb.draw_shortest_path(path, distance, destinations)
+        plt.gcf().canvas.draw()
+        latencies.append(time.perf_counter() - began)
+        plt.close("all")
+    return {"method": "draw", "stops": len(destinations), "queries": repeat, "mean_ms": statistics.mean(latencies) * 1000,
+            "p50_ms": percentile(latencies, 50) * 1000, "p90_ms": percentile(latencies, 90) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000, "peak_kb": None, "searches_per_query": None}
+
+
+# 🔹 เทียบกับ baseline: ชุดที่ p50 ช้ากว่า baseline เกิน threshold (สัดส่วน) ถือว่าถดถอย
+def compare(results, baseline, threshold=0.2, metric="p50_ms"):
+    previous = {(row["method"], row["stops"]): row for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'method':18} | {'stops':>5} | {'baseline':>10} | {'current':>10} | change")
+    print("-" * 65)
+    for row in results["results"]:
+        old = previous.get((row["method"], row["stops"]))
+        if old is None or not old.get(metric):
+            continue
+        change = row[metric] / old[metric] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{row['method']:18} | {row['stops']:5} | {old[metric]:8.2f}ms | {row[metric]:8.2f}ms | {change:+7.1%}{flag}")
+        if flag:
+            regressions.append((row["method"], row["stops"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark café route solvers on synthetic graphs.")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--degree", type=int, default=4, help="roads per node (density)")
+    parser.add_argument("--cafes", type=float, default=0.2, help="fraction of nodes that are cafés")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stops", default="2,5,8,12,20", help="comma separated destination counts")
+    parser.add_argument("--methods", default="auto,heuristic", help="comma separated solver names")
+    parser.add_argument("--queries", type=int, default=20, help="queries per case")
+    parser.add_argument("--backend", choices=["nx", "csr", "ch"], default="nx")
+    parser.add_argument("--time-limit", type=float, default=0.1, help="heuristic time limit (s)")
+    parser.add_argument("--warm", action="store_true", help="keep Dijkstra rows cached between queries")
+    parser.add_argument("--draw", action="store_true", help="also time draw_shortest_path")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with this run")
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    graph = make_graph(args.nodes, args.degree, args.cafes, args.seed)
+    use_graph(graph, args.backend)
+    print(f"graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} roads, "
+          f"{len(cafe_routes.dic_cafe)} cafés ({args.backend}, {time.perf_counter() - began:.2f}s to build)")
+
+    options = {"time_limit": args.time_limit}
+    rows = []
+    print(f"\n{'method':18} | {'stops':>5} | {'p50':>9} | {'p90':>9} | {'p99':>9} | {'peak':>9} | searches")
+    print("-" * 85)
+    for stops in (int(s) for s in args.stops.split(",")):
+        queries = make_queries(graph, stops, args.queries, args.seed)
+        for method in args.methods.split(","):
+            row = run_case(queries, method, args.warm, options)
+            rows.append(row)
+            print(f"{method:18} | {stops:5} | {row['p50_ms']:7.2f}ms | {row['p90_ms']:7.2f}ms | {row['p99_ms']:7.2f}ms | "
+                  f"{row['peak_kb']:7.0f}KB | {row['searches_per_query']:.1f}")
+    if args.draw:
+        row = run_draw(make_queries(graph, int(args.stops.split(",")[0]), 1, args.seed))
+        rows.append(row)
+        print(f"{'draw':18} | {row['stops']:5} | {row['p50_ms']:7.2f}ms | {row['p90_ms']:7.2f}ms | {row['p99_ms']:7.2f}ms |")
+
+    results = {
+        "meta": {
+            "nodes": args.nodes, "degree": args.degree, "cafes": args.cafes, "seed": args.seed,
+            "backend": args.backend, "warm": args.warm, "queries": args.queries,
+            "python": platform.python_version(), "machine": platform.machine(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": rows,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("nodes") != args.nodes or baseline["meta"].get("backend") != args.backend:
+            print("warning: baseline was recorded with a different graph size or backend")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
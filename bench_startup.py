@@ -0,0 +1,84 @@
+"""
+วัดเวลาเริ่มโปรแกรม: import แต่ละโมดูลใน process ใหม่หลายรอบ แล้วรายงานเวลาและโมดูลหนัก ๆ ที่ถูกโหลด
+
+    python bench_startup.py                      # cafe_routes, newb, batch_routes, route_service
+    python bench_startup.py cafe_routes -n 20 --detail
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["matplotlib", "tkinter", "networkx", "numpy"]
+DEFAULT_MODULES = ["cafe_routes", "newb", "batch_routes", "route_service"]
+
+# โค้ดที่รันใน process ลูก: จับเวลา import แล้วพิมพ์ผลเป็น JSON
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, runs=10, cwd=None):
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    times, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        loaded = result["loaded"]
+    return {"module": module, "median": statistics.median(times), "min": min(times), "max": max(times), "loaded": loaded}
+
+
+# โมดูลที่ module import โดยตรง เรียงตามเวลาสะสม (จาก python -X importtime)
+def import_breakdown(module, top=10, cwd=None):
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import-time cost of the café route modules.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("--detail", action="store_true", help="show the slowest top-level imports")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'module':15} | {'median':>9} | {'min':>9} | loaded")
+    print("-" * 60)
+    for module in args.modules:
+        result = measure(module, args.runs)
+        results.append(result)
+        print(f"{module:15} | {result['median'] * 1000:7.1f}ms | {result['min'] * 1000:7.1f}ms | {', '.join(result['loaded']) or '-'}")
+        if args.detail:
+            for cumulative, name in import_breakdown(module):
+                print(f"{'':15}   {cumulative / 1000:7.1f}ms  {name}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
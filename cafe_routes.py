@@ -0,0 +1,1236 @@
+"""
+แกนหลักของการหาเส้นทางคาเฟ่ จังหวัดปราจีนบุรี (ข้อมูลกราฟ ตัวแก้ปัญหา แคช และการค้นหาคาเฟ่ใกล้เคียง)
+import ได้โดยไม่โหลด matplotlib/Tk จึงเริ่มทำงานเร็ว เหมาะกับ worker และงาน batch
+"""
+import networkx as nx
+import numpy as np
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from heapq import heappop, heappush
+from itertools import islice, permutations
+import graph_loader
+import nearby
+from contraction import ContractionHierarchy
+from csr_graph import CSRGraph
+from route_db import RouteStore, graph_hash
+
+# 🔹 สร้างกราฟ
+G = nx.Graph()
+
+dic_cafe = {
+    "A": "Myrrh Cafe Prachinburi",
+    "B": "Toast bar Cafe",
+    "C": "Noen Hom Cafe",
+    "D": "Rong See Coffee Prachinburi",
+    "E": "Homurumu Cafe",
+    "F": "Eto slowbar",
+    "G": "Nare Cafe",
+    "H": "VV Cafe & bistro",
+    "I": "Baan Fuangfah cafe"
+}
+
+cafes = ["A", "B", "C", "D", "E", "F", "G","H","I"]
+G.add_nodes_from(cafes)
+
+# เพิ่มข้อมูลชื่อคาเฟ่เป็น attribute ของแต่ละโหนด
+for cafe, name in dic_cafe.items():
+    G.nodes[cafe]["name"] = name
+
+edges = [
+    ("A", "B", 12),
+    ("A", "C", 10),
+    ("B", "C", 13),
+    ("B", "D", 7),
+    ("D", "G", 12),
+    ("E", "F", 9),
+    ("G", "H", 2),
+    ("G", "I", 5),
+    ("I", "E", 11),
+    ("I", "F", 3),
+    ("H", "I", 9),
+]
+G.add_weighted_edges_from(edges)
+
+# ตำแหน่งของคาเฟ่บนแผนที่
+positions = {
+    "A":(2,6), "B":(1,3), "C":(-0.2,8), "D":(1,0),
+    "E":(7,1.2), "F":(4,4), "G":(3,-4), "H":(5,-5), "I":(3,2)
+}
+
+# 🔹 ตารางระยะทางระหว่างจุด (Dijkstra ครั้งเดียวต่อโหนด)
+class DistanceMatrix:
+    def __init__(self, graph, nodes, store=None, hierarchy=None, legs=None):
+        self.nodes = list(dict.fromkeys(nodes))
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.hierarchy = hierarchy
+        self.dist = []
+        self.pred = []
+
+        # contraction hierarchy: each leg is an upward search from both ends, no full Dijkstra
+        if hierarchy is not None:
+            self.dist = hierarchy.distance_table(self.nodes)
+            return
+
+        # one single-source search per relevant node, kept as a dense row
+        cached = legs.get_legs(self.nodes) if legs is not None else {}
+        missing = [source for source in self.nodes if source not in cached]
+        stored = store.get_legs(missing) if store is not None and missing else {}
+        computed = {}
+        partial = {}
+        for source in self.nodes:
+            if source in cached:
+                pred, dist = cached[source]
+            elif source in stored:
+                pred, dist = stored[source]
+            elif isinstance(graph, CSRGraph) and store is None:
+                # without a store the search can stop as soon as every node of the set is settled
+                pred, dist = graph.predecessor_and_distance(source, targets=self.nodes)
+                partial[source] = (pred, dist)
+            else:
+                if isinstance(graph, CSRGraph):
+                    pred, dist = graph.predecessor_and_distance(source)
+                else:
+                    pred, dist = nx.dijkstra_predecessor_and_distance(graph, source, weight="weight")
+                computed[source] = (pred, dist)
+            self.dist.append([dist.get(target, float("inf")) for target in self.nodes])
+            self.pred.append(pred)
+
+        if computed and store is not None:
+            store.put_legs(computed)
+        if legs is not None:
+            legs.put_legs({**stored, **computed})
+            legs.put_legs(partial, complete=False)
+
+    # เส้นทางจริงของช่วง u → v จากตาราง predecessor
+    def leg_path(self, u, v):
+        if self.hierarchy is not None:
+            return self.hierarchy.shortest_path(u, v)[1]
+        pred = self.pred[self.index[u]]
+        path = [v]
+        while path[-1] != u:
+            path.append(pred[path[-1]][0])
+        path.reverse()
+        return path
+
+    # ประกอบเส้นทางเต็มจากลำดับ index ของจุดแวะ
+    def build_path(self, order):
+        path = [self.nodes[order[0]]]
+        for a, b in zip(order, order[1:]):
+            path.extend(self.leg_path(self.nodes[a], self.nodes[b])[1:])
+        return path
+
+
+# 🔹 ตัวแก้ปัญหาลำดับการแวะ
+# ทุกตัวรับ dist (ตารางระยะทาง), first (index จุดเริ่ม), stops (index จุดหมายที่ไม่ซ้ำ)
+# แล้วคืน (ลำดับจุดหมาย, ระยะทางรวม)
+
+BRUTE_FORCE_LIMIT = 7          # จำนวนจุดหมายสูงสุดที่ยังลองทุกลำดับ
+HELD_KARP_LIMIT = 16           # Held-Karp ใช้เวลา O(n²·2ⁿ) คงที่ (~0.2 วินาทีที่ 16-17 จุด, ~3 วินาทีที่ 20 จุด)
+BRANCH_AND_BOUND_LIMIT = 20    # 17-20 จุด branch-and-bound ตัดกิ่งได้เร็วกว่ามาก (<0.5 วินาทีที่ 20 จุด) เกินนี้ใช้ heuristic
+
+def route_length(dist, order):
+    return sum(dist[a][b] for a, b in zip(order, order[1:]))
+
+
+class Cancelled(Exception):
+    pass
+
+
+# progress["explored"] นับจำนวนลำดับที่ตรวจแล้ว, cancel (threading.Event) ใช้หยุดกลางทาง (ยก Cancelled)
+def solve_brute_force(dist, first, stops, progress=None, cancel=None, **_):
+    best_order, best_distance = (), float("inf")
+
+    for count, perm in enumerate(permutations(stops), 1):
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()
+        total_distance = 0
+        current_location = first
+
+        for next_stop in perm:
+            total_distance += dist[current_location][next_stop]
+            current_location = next_stop
+
+        if total_distance < best_distance:
+            best_distance, best_order = total_distance, perm
+        if progress is not None:
+            progress["explored"] = count
+
+    return best_order, route_length(dist, [first, *best_order])
+
+
+# Held-Karp: cost[mask, j] = ระยะสั้นสุดที่แวะครบทุกจุดใน mask แล้วจบที่ j
+def solve_held_karp(dist, first, stops, **_):
+    n = len(stops)
+    if n == 0:
+        return (), 0
+
+    leg = np.array([[dist[a][b] for b in stops] for a in stops], dtype=float)
+    full = 1 << n
+    cost = np.full((full, n), np.inf)
+    parent = np.full((full, n), -1, dtype=np.int8)
+    for j, stop in enumerate(stops):
+        cost[1 << j, j] = dist[first][stop]
+
+    masks = np.arange(full)
+    size = np.zeros(full, dtype=np.int8)
+    for j in range(n):
+        size += (masks >> j) & 1
+
+    # masks of the same size do not depend on each other, so fill a whole layer at once
+    for k in range(2, n + 1):
+        layer = masks[size == k]
+        for j in range(n):
+            bit = 1 << j
+            ending = layer[(layer & bit) != 0]
+            candidates = cost[ending ^ bit] + leg[:, j]
+            best = candidates.argmin(axis=1)
+            cost[ending, j] = candidates[np.arange(len(ending)), best]
+            parent[ending, j] = best
+
+    mask, last = full - 1, int(cost[full - 1].argmin())
+    order = []
+    while last >= 0:
+        order.append(stops[last])
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    order.reverse()
+
+    return tuple(order), route_length(dist, [first, *order])
+
+
+# 🔹 Heuristic สำหรับจุดหมายจำนวนมาก (nearest-neighbour + 2-opt/Or-opt)
+def nearest_neighbour_order(dist, first, stops):
+    remaining = set(stops)
+    order = []
+    current = first
+    while remaining:
+        current = min(remaining, key=lambda stop: dist[current][stop])
+        remaining.remove(current)
+        order.append(current)
+    return order
+
+
+# tour[0] คือจุดเริ่มซึ่งห้ามย้าย ส่วนปลายทางเปิด (ไม่ต้องกลับจุดเริ่ม)
+def two_opt(dist, tour, deadline):
+    improved = False
+    last = len(tour) - 1
+    for i in range(1, last):
+        if time.perf_counter() > deadline:
+            break
+        a, b = tour[i - 1], tour[i]
+        for j in range(i + 1, last + 1):
+            c = tour[j]
+            delta = dist[a][c] - dist[a][b]
+            if j < last:
+                e = tour[j + 1]
+                delta += dist[b][e] - dist[c][e]
+            if delta < -1e-9:
+                tour[i:j + 1] = reversed(tour[i:j + 1])
+                improved = True
+                b = tour[i]
+    return improved
+
+
+# ย้ายช่วงจุดแวะยาว 1-3 จุดไปแทรกตำแหน่งอื่น (กลับทิศได้)
+def or_opt(dist, tour, deadline):
+    improved = False
+    for length in (1, 2, 3):
+        i = 1
+        while i + length <= len(tour):
+            if time.perf_counter() > deadline:
+                return improved
+            prev, head, tail = tour[i - 1], tour[i], tour[i + length - 1]
+            removed = dist[prev][head]
+            if i + length < len(tour):
+                after = tour[i + length]
+                removed += dist[tail][after] - dist[prev][after]
+            rest = tour[:i] + tour[i + length:]
+
+            best_gain, best_move = 1e-9, None
+            for k, x in enumerate(rest):
+                y = rest[k + 1] if k + 1 < len(rest) else None
+                for segment_head, segment_tail, reverse in ((head, tail, False), (tail, head, True)):
+                    added = dist[x][segment_head]
+                    if y is not None:
+                        added += dist[segment_tail][y] - dist[x][y]
+                    if removed - added > best_gain:
+                        best_gain, best_move = removed - added, (k, reverse)
+
+            if best_move is None:
+                i += 1
+                continue
+            k, reverse = best_move
+            segment = tour[i:i + length]
+            if reverse:
+                segment.reverse()
+            tour[:] = rest[:k + 1] + segment + rest[k + 1:]
+            improved = True
+    return improved
+
+
+# ตำแหน่งแทรก stop ที่ทำให้เส้นทางยาวขึ้นน้อยที่สุด คืน (index ที่จะแทรก, ระยะที่เพิ่ม)
+def cheapest_insertion(dist, tour, stop):
+    best_position, best_cost = len(tour), dist[tour[-1]][stop]
+    for i in range(1, len(tour)):
+        a, b = tour[i - 1], tour[i]
+        cost = dist[a][stop] + dist[stop][b] - dist[a][b]
+        if cost < best_cost:
+            best_position, best_cost = i, cost
+    return best_position, best_cost
+
+
+def local_search(dist, tour, deadline):
+    while time.perf_counter() <= deadline:
+        if not (two_opt(dist, tour, deadline) | or_opt(dist, tour, deadline)):
+            break
+
+
+# ตัดเส้นทางเป็น 3 ช่วงแล้วสลับลำดับ เพื่อหลุดจาก local optimum
+def perturb(tour, rng):
+    if len(tour) < 4:
+        return list(tour)
+    i, j = sorted(rng.sample(range(1, len(tour)), 2))
+    return tour[:i] + tour[j:] + tour[i:j]
+
+
+# patience: จำนวน perturb ติดกันที่ไม่ดีขึ้นแล้วหยุดก่อนหมดเวลา (ค่าเริ่มต้นคือจำนวนวิธีตัดเส้นทางทั้งหมด)
+def solve_heuristic(dist, first, stops, time_limit=0.5, max_iterations=None, seed=0, patience=None, **_):
+    # จุดหมายน้อยกว่า 4 จุดลองทุกลำดับได้ทันที ไม่ต้องรอจนหมดเวลา
+    if len(stops) < 4:
+        return solve_brute_force(dist, first, stops)
+
+    deadline = time.perf_counter() + time_limit
+    rng = random.Random(seed)
+    if patience is None:
+        patience = len(stops) * (len(stops) - 1) // 2
+
+    best = [first, *nearest_neighbour_order(dist, first, stops)]
+    local_search(dist, best, deadline)
+    best_distance = route_length(dist, best)
+
+    # anytime: keep improving until the budget runs out, always holding the best-so-far tour
+    iteration = stale = 0
+    while time.perf_counter() < deadline and (max_iterations is None or iteration < max_iterations) and stale < patience:
+        iteration += 1
+        stale += 1
+        candidate = perturb(best, rng)
+        local_search(dist, candidate, deadline)
+        candidate_distance = route_length(dist, candidate)
+        if candidate_distance < best_distance:
+            best, best_distance = candidate, candidate_distance
+            stale = 0
+
+    return tuple(best[1:]), best_distance
+
+
+# 🔹 Branch-and-bound: ค้นหาแบบ depth-first แล้วตัดกิ่งที่ไม่มีทางดีกว่าคำตอบปัจจุบัน
+def mst_length(dist, nodes):
+    if len(nodes) < 2:
+        return 0
+    best = {node: dist[nodes[0]][node] for node in nodes[1:]}
+    total = 0
+    while best:
+        node = min(best, key=best.get)
+        total += best.pop(node)
+        for other in best:
+            if dist[node][other] < best[other]:
+                best[other] = dist[node][other]
+    return total
+
+
+# ขยาย prefix ทีละจุด คืนเส้นทางที่ดีกว่า best_distance หรือ None ถ้าไม่มี
+def branch_and_bound_search(dist, prefix, remaining, best_distance, stats, mst_cache=None):
+    if mst_cache is None:
+        mst_cache = {}
+    best_tour = None
+    tour = list(prefix)
+
+    # lower bound: ขาไปจุดที่ใกล้ที่สุด + MST ของจุดที่เหลือ (เส้นทางใดก็ตามยาวไม่น้อยกว่านี้)
+    def lower_bound(current, rest):
+        if rest not in mst_cache:
+            mst_cache[rest] = mst_length(dist, list(rest))
+        return min(dist[current][stop] for stop in rest) + mst_cache[rest]
+
+    def search(current, rest, cost):
+        nonlocal best_tour, best_distance
+        stats["expanded"] += 1
+        if not rest:
+            if cost < best_distance:
+                best_tour, best_distance = list(tour), cost
+            return
+
+        for next_stop in sorted(rest, key=lambda stop: dist[current][stop]):
+            next_cost = cost + dist[current][next_stop]
+            next_rest = rest - {next_stop}
+            bound = next_cost + lower_bound(next_stop, next_rest) if next_rest else next_cost
+            if bound >= best_distance:
+                stats["pruned"] += 1
+                continue
+            tour.append(next_stop)
+            search(next_stop, next_rest, next_cost)
+            tour.pop()
+
+    search(tour[-1], frozenset(remaining), route_length(dist, tour))
+    return best_tour, best_distance
+
+
+def solve_branch_and_bound(dist, first, stops, stats=None, **_):
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+    stats.setdefault("pruned", 0)
+
+    # คำตอบเริ่มต้นจาก nearest-neighbour ใช้เป็นขอบเขตบนตั้งแต่แรก
+    incumbent = [first, *nearest_neighbour_order(dist, first, stops)]
+    tour, best_distance = branch_and_bound_search(dist, [first], stops, route_length(dist, incumbent), stats)
+    if tour is None:
+        tour = incumbent
+
+    return tuple(tour[1:]), best_distance
+
+
+# 🔹 ค้นหาคำตอบที่ดีที่สุดแบบหลาย process (แบ่งงานตามจุดแวะแรก)
+_worker_dist = None
+
+# each worker receives the leg distances once instead of the graph per task
+def _init_worker(dist):
+    global _worker_dist
+    _worker_dist = dist
+
+
+def _search_subtree(prefix, remaining, best_distance):
+    stats = {"expanded": 0, "pruned": 0}
+    tour, distance = branch_and_bound_search(_worker_dist, prefix, remaining, best_distance, stats)
+    return tour, distance, stats
+
+
+def solve_parallel(dist, first, stops, workers=None, stats=None, **_):
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+    stats.setdefault("pruned", 0)
+    workers = workers or os.cpu_count() or 1
+
+    if len(stops) < 3:
+        return solve_branch_and_bound(dist, first, stops, stats=stats)
+
+    incumbent = [first, *nearest_neighbour_order(dist, first, stops)]
+    best_tour, best_distance = incumbent, route_length(dist, incumbent)
+
+    # แบ่งตามจุดแวะแรก ถ้างานน้อยกว่าจำนวน core มากก็แบ่งตามสองจุดแรก
+    prefixes = [[first, stop] for stop in stops]
+    if len(prefixes) < 2 * workers:
+        prefixes = [[first, a, b] for a in stops for b in stops if a != b]
+    prefixes.sort(key=lambda prefix: route_length(dist, prefix))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dist,)) as pool:
+        futures = [
+            pool.submit(_search_subtree, prefix, [stop for stop in stops if stop not in prefix], best_distance)
+            for prefix in prefixes
+        ]
+        for future in as_completed(futures):
+            tour, distance, sub_stats = future.result()
+            stats["expanded"] += sub_stats["expanded"]
+            stats["pruned"] += sub_stats["pruned"]
+            if tour is not None and distance < best_distance:
+                best_tour, best_distance = tour, distance
+
+    return tuple(best_tour[1:]), best_distance
+
+
+SOLVERS = {
+    "brute-force": solve_brute_force,
+    "held-karp": solve_held_karp,
+    "heuristic": solve_heuristic,
+    "branch-and-bound": solve_branch_and_bound,
+    "parallel": solve_parallel,
+}
+
+
+# 🔹 แคชผลลัพธ์เส้นทาง (LRU จำกัดขนาด/อายุ)
+class RouteCache:
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ลบทั้งหมด หรือเฉพาะรายการที่ predicate(key, value) เป็นจริง คืนจำนวนที่ลบ
+    def invalidate(self, predicate=None):
+        if predicate is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+        stale = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# 🔹 แคชผล Dijkstra รายโหนดต้นทาง (pred, dist) ใช้ซ้ำข้ามคำขอ และซ่อมได้เมื่อเส้นทางเปลี่ยน
+# จำกัดตามจำนวนโหนดที่เก็บรวมทุกแถว (ไม่ใช่จำนวนแถว) เพราะแถวหนึ่งของกราฟ 100k โหนดใหญ่ราว 14 MB
+# ค่าเริ่มต้น 1,000,000 ≈ 140 MB ต่อ process; แถวล่าสุดเก็บไว้เสมอแม้จะใหญ่กว่าขีดจำกัด
+class LegCache:
+    def __init__(self, max_entries=1_000_000):
+        self.max_entries = max_entries
+        self.entries = 0
+        self._rows = OrderedDict()   # source -> (pred, dist, complete)
+
+    # complete=False คือ Dijkstra ที่หยุดเมื่อ settle ครบชุดโหนดของคำขอนั้น ใช้ได้เมื่อมีทุกโหนดที่ต้องการ
+    def get_legs(self, nodes):
+        rows = {}
+        for source in nodes:
+            row = self._rows.get(source)
+            if row is not None and (row[2] or all(node in row[1] for node in nodes)):
+                self._rows.move_to_end(source)
+                rows[source] = row[:2]
+        return rows
+
+    def put_legs(self, legs, complete=True):
+        for source, (pred, dist) in legs.items():
+            old = self._rows.pop(source, None)
+            if old is not None:
+                self.entries -= len(old[1])
+            self._rows[source] = (pred, dist, complete)
+            self.entries += len(dist)
+        self._evict()
+
+    def _evict(self):
+        while self.entries > self.max_entries and len(self._rows) > 1:
+            self.entries -= len(self._rows.popitem(last=False)[1][1])
+
+    def row(self, source):
+        return self._rows.get(source)
+
+    def invalidate(self):
+        self._rows.clear()
+        self.entries = 0
+
+    # เส้นทาง u-v เปลี่ยนเป็น weight (None = ถูกลบ): ซ่อมแถวที่ซ่อมได้ ทิ้งเฉพาะแถวที่ได้รับผลกระทบ
+    def edge_changed(self, graph, u, v, weight, shorter):
+        dropped = 0
+        for source, (pred, dist, complete) in list(self._rows.items()):
+            if shorter:
+                du, dv = dist.get(u, math.inf), dist.get(v, math.inf)
+                if du + weight >= dv and dv + weight >= du:
+                    continue
+                if isinstance(dist, dict) and complete:
+                    size = len(dist)
+                    _repair_row(graph, pred, dist, u, v, weight)
+                    self.entries += len(dist) - size   # เส้นใหม่อาจเชื่อมไปยังโหนดที่เดิมไปไม่ถึง
+                    continue
+            else:
+                uses = [(a, b) for a, b in ((u, v), (v, u)) if a in pred.get(b, ())]
+                if not uses:
+                    continue
+                # a tie through another predecessor keeps the distance; just forget this one
+                if isinstance(pred, dict) and all(len(pred[b]) > 1 for _, b in uses):
+                    for a, b in uses:
+                        pred[b].remove(a)
+                    continue
+            del self._rows[source]
+            self.entries -= len(dist)
+            dropped += 1
+        self._evict()
+        return dropped
+
+
+# เส้นทางสั้นลง: Dijkstra เฉพาะส่วนที่ระยะทางดีขึ้น เริ่มจากปลายเส้นที่เปลี่ยน
+def _repair_row(graph, pred, dist, u, v, weight):
+    heap = []
+    for a, b in ((u, v), (v, u)):
+        if a in dist and dist[a] + weight < dist.get(b, math.inf):
+            dist[b] = dist[a] + weight
+            pred[b] = [a]
+            heappush(heap, (dist[b], b))
+    while heap:
+        d, x = heappop(heap)
+        if d > dist[x]:
+            continue
+        for y, data in graph.adj[x].items():
+            nd = d + data["weight"]
+            if nd < dist.get(y, math.inf):
+                dist[y] = nd
+                pred[y] = [x]
+                heappush(heap, (nd, y))
+
+
+route_cache = RouteCache()
+leg_cache = LegCache()
+csr_backend = None   # กราฟ CSR ที่ใช้คำนวณแทน G (เปิดด้วย use_csr_backend)
+route_store = None   # แคชบนดิสก์ (เปิดด้วย open_route_store)
+contraction_hierarchy = None   # เปิดด้วย use_contraction_hierarchy
+contraction_hierarchy_path = None
+contraction_hierarchy_stale = False   # เส้นทางถูกแก้หลังสร้าง CH (สร้างใหม่เมื่อต้องใช้ครั้งถัดไป)
+_snapshot_graph = None   # กราฟ CSR จาก snapshot ที่ยังไม่ได้สร้างเป็น G (ดู network_graph)
+
+
+def open_route_store(path):
+    global route_store
+    route_store = RouteStore(path, routing_graph())
+    return route_store
+
+# 🔹 contraction hierarchy ของกราฟปัจจุบัน: เปิดจากไฟล์ถ้า hash ตรงกัน ไม่เช่นนั้นสร้างใหม่แล้วบันทึก
+def use_contraction_hierarchy(path=None, enabled=True):
+    global contraction_hierarchy, contraction_hierarchy_path, contraction_hierarchy_stale
+    contraction_hierarchy, contraction_hierarchy_path, contraction_hierarchy_stale = None, path, False
+    if not enabled:
+        return None
+
+    graph = routing_graph()
+    digest = graph_hash(graph)
+    if path is not None and os.path.exists(path):
+        hierarchy = ContractionHierarchy.load(path)
+        if hierarchy.graph_hash == digest:
+            contraction_hierarchy = hierarchy
+            return hierarchy
+
+    contraction_hierarchy = ContractionHierarchy.build(graph, digest)
+    if path is not None:
+        contraction_hierarchy.save(path)
+    return contraction_hierarchy
+
+
+# CH ที่ตรงกับกราฟปัจจุบัน แก้เส้นทางหลายครั้งติดกันก็สร้างใหม่ครั้งเดียวเมื่อมีคำขอ
+def current_hierarchy():
+    if contraction_hierarchy_stale:
+        use_contraction_hierarchy(contraction_hierarchy_path)
+    return contraction_hierarchy
+
+
+def use_csr_backend(enabled=True):
+    global csr_backend
+    if _snapshot_graph is not None and enabled:
+        csr_backend = _snapshot_graph   # G ยังไม่ถูกสร้าง กราฟจาก snapshot คือข้อมูลล่าสุด
+    else:
+        csr_backend = CSRGraph.from_networkx(network_graph()) if enabled else None
+    return csr_backend
+
+
+def routing_graph():
+    return csr_backend if csr_backend is not None else G
+
+
+# G แบบ networkx: เมื่อโหลดจาก snapshot จะสร้างเมื่อมีผู้ใช้ครั้งแรก (แก้เส้นทาง วาดแผนที่ ปิด CSR backend)
+# การหาเส้นทาง/คาเฟ่ใกล้เคียงใช้ CSR ได้เลยจึงไม่ต้องรอสร้าง networkx.Graph
+def network_graph():
+    global _snapshot_graph
+    if _snapshot_graph is not None:
+        G.update(graph_loader.to_networkx(_snapshot_graph))
+        _snapshot_graph = None
+    return G
+
+
+# ตัวนับการเปลี่ยนแปลงของกราฟ เก็บไว้นอก G เพราะ G.clear() (ตอนโหลดกราฟใหม่) ล้าง G.graph ไปด้วย
+_graph_version = 0    # เพิ่มเมื่อกราฟเปลี่ยนทั้งกราฟ (mark_graph_changed)
+_graph_revision = 0   # เพิ่มทุกครั้งที่กราฟเปลี่ยน รวมการแก้เส้นทางทีละเส้น
+
+# ใช้เป็น key ของข้อมูลที่สร้างจากกราฟ เช่น ภาพแผนที่
+def graph_revision():
+    return _graph_revision
+
+
+# "A,B,C" กับ "C,A,B" ได้คำตอบเดียวกัน จึงใช้ frozenset เป็น key
+# ตัวเลือกของ solver (time_limit, seed, ...) ให้คำตอบต่างกันได้จึงอยู่ใน key ด้วย ยกเว้น stats ที่เป็นค่าส่งออก
+# ตัวเลือกที่ใช้ติดตาม/ควบคุมการคำนวณ ไม่มีผลต่อคำตอบจึงไม่อยู่ใน key และผู้ที่ส่งมาจะไม่ได้ผลจากแคช
+TRACKING_OPTIONS = ("stats", "progress", "cancel")
+
+def route_key(start, destinations, method="auto", **options):
+    options = tuple(sorted((name, value) for name, value in options.items() if name not in TRACKING_OPTIONS))
+    return (start, frozenset(destinations), _graph_version, method, options)
+
+
+# เรียกทุกครั้งที่แก้ไขเส้นทางใน G เพื่อไม่ให้ใช้ผลลัพธ์เก่า
+def mark_graph_changed():
+    global _graph_version, _graph_revision
+    _graph_version += 1
+    _graph_revision += 1
+    route_cache.invalidate()
+    leg_cache.invalidate()
+    if csr_backend is not None:
+        use_csr_backend()
+    if route_store is not None:
+        route_store.bind(routing_graph())
+    if contraction_hierarchy is not None:
+        use_contraction_hierarchy(contraction_hierarchy_path)
+
+
+# 🔹 แก้ไขเส้นทางระหว่างรันโปรแกรม (เช่น รถติด/ถนนปิด) โดยไม่ล้างแคชทั้งหมด
+def update_edge(u, v, weight):
+    return _change_edge(u, v, weight)
+
+
+def remove_edge(u, v):
+    return _change_edge(u, v, None)
+
+
+def _path_uses(path, u, v):
+    return any({a, b} == {u, v} for a, b in zip(path, path[1:]))
+
+
+# ระยะทางระหว่างจุดใดคู่หนึ่งของคำขอจะสั้นลงได้ไหมถ้าเพิ่มเส้น u-v ที่ยาว weight (ดูจาก leg_cache เดิม)
+# row(source) คืน (pred, dist, complete) หรือ None
+def _legs_may_shorten(nodes, u, v, weight, row=None):
+    row = row or leg_cache.row
+    for a in nodes:
+        row_a = row(a)
+        if row_a is None:
+            return True
+        for b in nodes:
+            row_b = row(b)
+            if a == b:
+                continue
+            if row_b is None or (b not in row_a[1] and not row_a[2]):
+                return True
+            da, db = row_a[1], row_b[1]
+            through = min(
+                da.get(u, math.inf) + weight + db.get(v, math.inf),
+                da.get(v, math.inf) + weight + db.get(u, math.inf),
+            )
+            if through < da.get(b, math.inf):
+                return True
+    return False
+
+
+# แถวใน route_store ที่ใช้ไม่ได้หลังเส้น u-v เปลี่ยน (ตรวจจากข้อมูลเดิมก่อนแก้ G): (sources, queries)
+def _stale_store_rows(u, v, weight, shorter):
+    sources, rows = [], {}
+    for source, pred, dist in route_store.iter_legs():
+        if shorter:
+            du, dv = dist.get(u, math.inf), dist.get(v, math.inf)
+            stale = du + weight < dv or dv + weight < du
+            rows[source] = (pred, dist, True)
+        else:
+            stale = u in pred.get(v, ()) or v in pred.get(u, ())
+        if stale:
+            sources.append(source)
+
+    queries = []
+    for query, start, destinations, path in route_store.iter_routes():
+        if _legs_may_shorten({start, *destinations}, u, v, weight, rows.get) if shorter else _path_uses(path, u, v):
+            queries.append(query)
+    return sources, queries
+
+
+# คืนจำนวน (เส้นทางในแคช, แถว Dijkstra) ที่ถูกทิ้ง
+def _change_edge(u, v, weight):
+    global csr_backend, contraction_hierarchy_stale, _graph_revision
+    network_graph()
+    for node in (u, v):
+        if node not in G:
+            raise nx.NodeNotFound(f"Node {node} not in graph")
+    old = G[u][v]["weight"] if G.has_edge(u, v) else None
+    if old is None and weight is None:
+        raise nx.NetworkXError(f"The edge {u}-{v} is not in the graph")
+    if old == weight:
+        return 0, 0
+
+    # เตรียมข้อมูลใหม่ก่อนแก้ G ถ้าผิดพลาดตรงนี้ทุกอย่างยังเป็นกราฟเดิม
+    # เส้นทางยาวขึ้น/ถูกลบ: กระทบเฉพาะคำตอบที่ใช้เส้นนี้
+    # เส้นทางสั้นลง/เพิ่มใหม่: กระทบเฉพาะคำขอที่ระยะระหว่างจุดแวะสั้นลงได้ (ตรวจก่อนซ่อม leg_cache)
+    shorter = weight is not None and (old is None or weight < old)
+    csr = csr_backend.with_edge(u, v, weight) if csr_backend is not None else None
+    stale_rows = _stale_store_rows(u, v, weight, shorter) if route_store is not None else ((), ())
+    if shorter:
+        routes = route_cache.invalidate(lambda key, value: _legs_may_shorten({key[0], *key[1]}, u, v, weight))
+    else:
+        routes = route_cache.invalidate(lambda key, value: _path_uses(value[0], u, v))
+
+    if weight is None:
+        G.remove_edge(u, v)
+    else:
+        G.add_edge(u, v, weight=weight)
+    _graph_revision += 1
+    try:
+        legs = leg_cache.edge_changed(G, u, v, weight, shorter)
+        if csr is not None:
+            csr_backend = csr
+        if route_store is not None:
+            route_store.rebind(G, *stale_rows)
+    except BaseException:
+        # คืนเส้นเดิมแล้วสร้างข้อมูลทั้งหมดจาก G ใหม่ ไม่ให้ค้างอยู่ครึ่งทาง
+        if old is None:
+            G.remove_edge(u, v)
+        else:
+            G.add_edge(u, v, weight=old)
+        mark_graph_changed()
+        raise
+    # CH แก้ทีละเส้นไม่ได้ (ต้อง contract ใหม่) จึงสร้างใหม่เมื่อมีคำขอถัดไป
+    if contraction_hierarchy is not None:
+        contraction_hierarchy_stale = True
+    return routes, legs
+
+
+# 🔹 โหลดคาเฟ่และเส้นทางจากไฟล์แทนข้อมูลตัวอย่างด้านบน
+# snapshot: ไฟล์ binary ของกราฟ ถ้าใหม่กว่าไฟล์ CSV/JSONL จะเปิดแทนการอ่านไฟล์ใหม่
+# ไม่เช่นนั้นอ่านไฟล์แล้วเขียน snapshot ไว้ใช้ครั้งถัดไป
+# เมื่อใช้ snapshot กราฟ CSR ถูกใช้เป็น csr_backend ทันที และสร้าง G เมื่อต้องใช้เท่านั้น (network_graph)
+def load_cafes(nodes_path, edges_path, snapshot=None):
+    if snapshot is None:
+        set_graph(graph_loader.load_graph(nodes_path, edges_path))
+        return
+    if graph_loader.snapshot_is_fresh(snapshot, nodes_path, edges_path):
+        csr = graph_loader.load_snapshot(snapshot)
+    else:
+        csr = graph_loader.load_csr(nodes_path, edges_path)
+        graph_loader.save_snapshot(csr, snapshot)
+    set_csr_graph(csr)
+
+
+# 🔹 แทนกราฟทั้งกราฟด้วย networkx.Graph (node attribute: name, pos)
+def set_graph(graph):
+    global _snapshot_graph
+    _snapshot_graph = None
+    G.clear()
+    G.update(graph)
+    dic_cafe.clear()
+    dic_cafe.update(nx.get_node_attributes(G, "name"))
+    positions.clear()
+    positions.update(nx.get_node_attributes(G, "pos"))
+    mark_graph_changed()
+
+
+# แทนกราฟทั้งกราฟด้วย CSRGraph (labels/coords) โดยยังไม่สร้าง G
+def set_csr_graph(csr):
+    global _snapshot_graph, csr_backend
+    G.clear()
+    _snapshot_graph = csr_backend = csr
+    dic_cafe.clear()
+    dic_cafe.update(csr.labels)
+    positions.clear()
+    if csr.coords is not None:
+        positions.update((name, (x, y)) for name, (x, y) in zip(csr.names, csr.coords.tolist()) if not math.isnan(x))
+    mark_graph_changed()
+
+
+# 🔹 ฟังก์ชันหาเส้นทางที่ดีที่สุด
+
+# แปลงจุดหมายเป็น index ที่ไม่ซ้ำและไม่ใช่จุดเริ่ม
+def route_stops(matrix, start, destinations):
+    first = matrix.index[start]
+    stops = [i for i in dict.fromkeys(matrix.index[dest] for dest in destinations) if i != first]
+
+    if any(matrix.dist[first][stop] == float("inf") for stop in stops):
+        raise nx.NetworkXNoPath(f"No path from {start} to {', '.join(map(str, destinations))}")
+    return first, stops
+
+
+def pick_method(method, stop_count):
+    if method == "auto":
+        if stop_count <= BRUTE_FORCE_LIMIT:
+            method = "brute-force"
+        elif stop_count <= HELD_KARP_LIMIT:
+            method = "held-karp"
+        elif stop_count <= BRANCH_AND_BOUND_LIMIT:
+            method = "branch-and-bound"
+        else:
+            method = "heuristic"
+    if method not in SOLVERS:
+        raise ValueError(f"Unknown method: {method}")
+    return method
+
+
+# 🔹 จุดหมายเดียว: ค้นหาครั้งเดียวได้ทั้งเส้นทางและระยะทาง
+# use_positions: ใช้ A* กับระยะเส้นตรงจาก positions (ต้องเป็นหน่วยเดียวกับ weight)
+def shortest_leg(start, end, use_positions=False):
+    graph = routing_graph()
+    hierarchy = current_hierarchy()
+    if hierarchy is not None:
+        distance, path = hierarchy.shortest_path(start, end)
+        if path is None:
+            raise nx.NetworkXNoPath(f"No path from {start} to {end}")
+        return path, distance
+    if isinstance(graph, CSRGraph):
+        distance, path = graph.bidirectional(graph.node_id(start), graph.node_id(end))
+        if path is None:
+            raise nx.NetworkXNoPath(f"No path from {start} to {end}")
+        return [graph.names[u] for u in path], distance
+
+    if use_positions:
+        path = nx.astar_path(graph, start, end, heuristic=lambda u, v: math.dist(positions[u], positions[v]), weight="weight")
+        return path, nx.path_weight(graph, path, weight="weight")
+
+    distance, path = nx.bidirectional_dijkstra(graph, start, end, weight="weight")
+    return path, distance
+
+
+def find_best_shortest_path(start, destinations, method="auto", use_cache=True, use_positions=False, **options):
+    # ผู้เรียกที่ขอ stats/progress ต้องได้ค่าจากการคำนวณจริง จึงไม่ใช้แคช
+    use_cache = use_cache and not any(name in options for name in TRACKING_OPTIONS)
+    key = route_key(start, destinations, method, **options)
+    if use_cache:
+        cached = route_cache.get(key)
+        if cached is None and route_store is not None:
+            cached = route_store.get_route(start, destinations, method, key[4])
+            if cached is not None:
+                route_cache.put(key, cached)
+        if cached is not None:
+            return list(cached[0]), cached[1]
+
+    ends = [dest for dest in dict.fromkeys(destinations) if dest != start]
+    if len(ends) == 1:
+        path, best_distance = shortest_leg(start, ends[0], use_positions)
+    else:
+        matrix = DistanceMatrix(routing_graph(), [start, *destinations], store=route_store, hierarchy=current_hierarchy(), legs=leg_cache)
+        first, stops = route_stops(matrix, start, destinations)
+        solver = pick_method(method, len(stops))
+
+        order, best_distance = SOLVERS[solver](matrix.dist, first, stops, **options)
+        path = matrix.build_path([first, *order])
+    if use_cache:
+        route_cache.put(key, (path, best_distance))
+        if route_store is not None:
+            route_store.put_route(start, destinations, method, path, best_distance, key[4])
+    return list(path), best_distance
+
+
+# 🔹 หาเส้นทางหลายคำขอในครั้งเดียว (batch)
+def _solve_order(dist, first, stops, method, options):
+    return SOLVERS[method](dist, first, stops, **options)
+
+
+# กราฟ/CH ของ worker ใน solve_many ส่งครั้งเดียวตอนสร้าง pool ไม่ต้องส่งไปกับทุกงาน
+_batch_graph = None
+_batch_hierarchy = None
+
+def _init_batch_worker(graph, hierarchy):
+    global _batch_graph, _batch_hierarchy
+    _batch_graph, _batch_hierarchy = graph, hierarchy
+
+
+# งานหนึ่งชิ้นต่อชุดโหนด: ค้นหา Dijkstra สร้างตาราง แก้ทุกคำขอของชุด แล้วคืน [(path, distance) หรือ exception, ...]
+def _solve_group(nodes, queries, method, options):
+    matrix = DistanceMatrix(_batch_graph, nodes, hierarchy=_batch_hierarchy, legs=leg_cache)
+    results = []
+    for start, destinations in queries:
+        try:
+            first, stops = route_stops(matrix, start, destinations)
+            order, distance = SOLVERS[pick_method(method, len(stops))](matrix.dist, first, stops, **options)
+        except (nx.NetworkXNoPath, ValueError) as e:
+            results.append(e)
+            continue
+        results.append((matrix.build_path([first, *order]), distance))
+    return results
+
+
+# queries: ลำดับของ (start, destinations)
+# yield (ลำดับคำขอ, (path, distance)) ตามที่คำนวณเสร็จ หรือ (ลำดับคำขอ, exception) ถ้าหาเส้นทางไม่ได้
+# window: อ่านคำขอทีละไม่เกิน window รายการและรอให้งานค้างลดลงก่อนอ่านต่อ (หน่วยความจำคงที่)
+# ถ้าไม่กำหนดจะอ่านคำขอทั้งหมดก่อน ทำให้จัดกลุ่มที่ใช้ตารางร่วมกันได้มากที่สุด
+# ตารางระยะทาง (Dijkstra) และการแก้ลำดับทำใน worker ทั้งหมด process หลักแค่อ่านคำขอ/แคชและส่งผล
+def solve_many(queries, method="auto", workers=None, use_cache=True, window=None, **options):
+    graph = routing_graph()
+    numbered = enumerate(queries)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(graph, current_hierarchy())) as pool:
+        pending = {}
+
+        def finished(futures):
+            for future in futures:
+                group = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [e] * len(group)
+                for (key, indices), result in zip(group.items(), results):
+                    if isinstance(result, Exception):
+                        for i in indices:
+                            yield i, result
+                        continue
+                    path, distance = result
+                    if use_cache:
+                        route_cache.put(key, (path, distance))
+                        if route_store is not None:
+                            route_store.put_route(key[0], key[1], method, path, distance, key[4])
+                    for i in indices:
+                        yield i, (list(path), distance)
+
+        while True:
+            batch = list(islice(numbered, window)) if window else list(numbered)
+            if not batch:
+                break
+
+            # คำขอที่จุดเหมือนกันคำนวณครั้งเดียว และคำขอที่ใช้ชุดโหนดเดียวกันใช้ตารางระยะทางร่วมกัน
+            groups = {}
+            for i, (start, destinations) in batch:
+                missing = [node for node in (start, *destinations) if node not in graph]
+                if missing:
+                    yield i, nx.NodeNotFound(f"Node {missing[0]} not in graph")
+                    continue
+                key = route_key(start, destinations, method, **options)
+                cached = route_cache.get(key) if use_cache else None
+                if cached is None and use_cache and route_store is not None:
+                    cached = route_store.get_route(start, destinations, method, key[4])
+                if cached is not None:
+                    yield i, (list(cached[0]), cached[1])
+                    continue
+                groups.setdefault(key[1] | {start}, {}).setdefault(key, []).append(i)
+
+            for nodes, group in groups.items():
+                future = pool.submit(_solve_group, list(nodes), [(key[0], list(key[1])) for key in group], method, options)
+                pending[future] = group
+
+            # ส่งผลลัพธ์ที่เสร็จแล้วออกไปก่อนอ่านคำขอชุดถัดไป
+            yield from finished([future for future in pending if future.done()])
+
+            if not window:
+                break
+            while len(pending) >= window:
+                yield from finished(wait(list(pending), return_when=FIRST_COMPLETED).done)
+
+        yield from finished(as_completed(list(pending)))
+
+# 🔹 ทริปที่แก้ไขได้ทีละจุด (เพิ่ม/ลบคาเฟ่) โดยไม่ต้องคำนวณใหม่ทั้งหมด
+class RouteSession:
+    def __init__(self, start, destinations=(), method="auto", time_limit=0.05):
+        self.start = start
+        self.method = method
+        self.time_limit = time_limit
+        self.matrix = DistanceMatrix(routing_graph(), [start, *destinations], legs=leg_cache)
+        self.tour = [self.matrix.index[start]]
+        if destinations:
+            self._solve(destinations)
+
+    @property
+    def destinations(self):
+        return [self.matrix.nodes[i] for i in self.tour[1:]]
+
+    @property
+    def distance(self):
+        return route_length(self.matrix.dist, self.tour)
+
+    @property
+    def path(self):
+        return self.matrix.build_path(self.tour)
+
+    def route(self):
+        return self.path, self.distance
+
+    # แก้ปัญหาใหม่ทั้งหมด (ใช้เมื่อผู้ใช้ขอ)
+    def resolve(self):
+        return self._solve(self.destinations)
+
+    def _solve(self, destinations):
+        first, stops = route_stops(self.matrix, self.start, destinations)
+        order, _ = SOLVERS[pick_method(self.method, len(stops))](self.matrix.dist, first, stops)
+        self.tour = [first, *order]
+        return self.route()
+
+    def add_stop(self, stop):
+        if stop in self.destinations or stop == self.start:
+            return self.route()
+        if stop not in self.matrix.index:
+            # rows of the existing stops come back from leg_cache, only the new stop needs a search
+            self.matrix = DistanceMatrix(routing_graph(), [*self.matrix.nodes, stop], legs=leg_cache)
+        index = self.matrix.index[stop]
+        if self.matrix.dist[self.tour[0]][index] == float("inf"):
+            raise nx.NetworkXNoPath(f"No path from {self.start} to {stop}")
+
+        position, _ = cheapest_insertion(self.matrix.dist, self.tour, index)
+        self.tour.insert(position, index)
+        local_search(self.matrix.dist, self.tour, time.perf_counter() + self.time_limit)
+        return self.route()
+
+    def remove_stop(self, stop):
+        if stop not in self.destinations:
+            raise ValueError(f"{stop} is not a destination of this route")
+        self.tour.remove(self.matrix.index[stop])
+        local_search(self.matrix.dist, self.tour, time.perf_counter() + self.time_limit)
+        return self.route()
+
+
+# 🔹 หลายไรเดอร์: แบ่งจุดหมายให้ k คน แล้วหาเส้นทางของแต่ละคนพร้อมกัน
+# จัดกลุ่มแบบ k-medoids ด้วยระยะทางบนถนนจากตารางระยะทางชุดเดียวกัน
+def cluster_stops(dist, first, stops, k, rounds=10):
+    if k < 1:
+        raise ValueError(f"need at least one group, got {k}")
+    if not stops:
+        return [[] for _ in range(k)]
+    # farthest-first เลือกเฉพาะจุดที่ยังไม่เป็น medoid (จุดที่ห่างกัน 0 จะไม่ถูกเลือกซ้ำ)
+    medoids = [max(stops, key=lambda stop: dist[first][stop])]
+    while len(medoids) < min(k, len(stops)):
+        medoids.append(max((stop for stop in stops if stop not in medoids), key=lambda stop: min(dist[m][stop] for m in medoids)))
+
+    groups = []
+    for _ in range(rounds):
+        groups = [[] for _ in medoids]
+        for stop in stops:
+            groups[min(range(len(medoids)), key=lambda i: dist[medoids[i]][stop])].append(stop)
+        # medoid ถูกจัดเข้ากลุ่มอื่นที่ระยะเท่ากันได้ กลุ่มที่ว่างจึงใช้ medoid เดิม
+        new_medoids = [
+            min(group, key=lambda c: sum(dist[c][stop] for stop in group)) if group else medoid
+            for medoid, group in zip(medoids, groups)
+        ]
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+    return groups + [[] for _ in range(k - len(groups))]
+
+
+# ย้ายจุดแวะออกจากเส้นทางที่ยาวที่สุดทีละจุด ตราบใดที่ makespan (เส้นทางที่ยาวที่สุด) ลดลง
+def balance_tours(dist, tours, time_limit=0.2, max_moves=200):
+    deadline = time.perf_counter() + time_limit
+    for _ in range(max_moves):
+        if time.perf_counter() > deadline:
+            break
+        lengths = [route_length(dist, tour) for tour in tours]
+        worst = max(range(len(tours)), key=lambda i: lengths[i])
+        best_makespan, best_move = lengths[worst], None
+
+        for position in range(1, len(tours[worst])):
+            stop = tours[worst][position]
+            shortened = tours[worst][:position] + tours[worst][position + 1:]
+            remaining = route_length(dist, shortened)
+            for j, tour in enumerate(tours):
+                if j == worst:
+                    continue
+                insert_at, added = cheapest_insertion(dist, tour, stop)
+                makespan = max([remaining, lengths[j] + added] + [lengths[i] for i in range(len(tours)) if i not in (worst, j)])
+                if makespan < best_makespan - 1e-9:
+                    best_makespan, best_move = makespan, (position, j, insert_at)
+
+        if best_move is None:
+            break
+        position, j, insert_at = best_move
+        stop = tours[worst].pop(position)
+        tours[j].insert(insert_at, stop)
+        local_search(dist, tours[worst], deadline)
+        local_search(dist, tours[j], deadline)
+    return tours
+
+
+# คืน [(path, distance), ...] k เส้นทาง (ไรเดอร์ที่ไม่มีงานได้ [start], 0)
+def find_courier_routes(start, destinations, couriers, method="auto", workers=None):
+    if couriers < 1:
+        raise ValueError(f"couriers must be at least 1, got {couriers}")
+    matrix = DistanceMatrix(routing_graph(), [start, *destinations], legs=leg_cache)
+    first, stops = route_stops(matrix, start, destinations)
+    if not stops:
+        return [([start], 0) for _ in range(couriers)]
+    dist = matrix.dist
+
+    tours = []
+    for group in cluster_stops(dist, first, stops, couriers):
+        tour = [first, *nearest_neighbour_order(dist, first, group)]
+        local_search(dist, tour, time.perf_counter() + 0.05)
+        tours.append(tour)
+    balance_tours(dist, tours)
+
+    # แต่ละกลุ่มแก้ปัญหาใน process แยกกัน (ส่งแค่ตารางระยะทาง)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for tour in tours:
+            group = tour[1:]
+            futures.append(pool.submit(_solve_order, dist, first, group, pick_method(method, len(group)), {}))
+        routes = []
+        for tour, future in zip(tours, futures):
+            order, distance = future.result()
+            # keep the balanced tour if the sub-solver (e.g. a heuristic) did worse
+            if distance > route_length(dist, tour):
+                order, distance = tuple(tour[1:]), route_length(dist, tour)
+            routes.append((matrix.build_path([first, *order]), distance))
+    return routes
+
+
+# ดัชนีของคาเฟ่ (KD-tree ของพิกัด + id ใน CSR) สร้างใหม่เมื่อกราฟเปลี่ยน
+_cafe_index = None
+
+def cafe_index():
+    global _cafe_index
+    graph = routing_graph()
+    key = (graph_revision(), id(graph))
+    if _cafe_index is None or _cafe_index["key"] != key:
+        _cafe_index = {
+            "key": key,
+            "tree": nearby.KDTree((x, y, cafe) for cafe, (x, y) in positions.items() if cafe in dic_cafe),
+            "ids": {graph.ids[cafe] for cafe in dic_cafe if cafe in graph.ids} if isinstance(graph, CSRGraph) else None,
+        }
+    return _cafe_index
+
+
+#ฟังก์ชันหาคาเฟ่ใกล้เคียงตามระยะทางบนถนน คืน [(คาเฟ่, ระยะทาง), ...]
+# use_positions: ใช้ระยะเส้นตรงถึงคาเฟ่ที่ใกล้ที่สุดช่วยตัดการค้นหา
+# ใช้ได้เมื่อพิกัดเป็นหน่วยเดียวกับ weight (ระยะเส้นตรงไม่เกินระยะบนถนน)
+def find_nearby_cafes(start, max_results=3, radius=None, use_positions=False):
+    graph = routing_graph()
+    index = cafe_index()
+
+    def straight_line(node):
+        xy = positions.get(node)
+        return index["tree"].nearest(*xy)[0] if xy is not None else 0
+
+    if isinstance(graph, CSRGraph):
+        names = graph.names
+        heuristic = (lambda u: straight_line(names[u])) if use_positions else None
+        found = nearby.k_nearest(graph.edges_from, graph.node_id(start), index["ids"], max_results, radius, heuristic)
+        return [(names[u], d) for u, d in found]
+
+    def adjacency(u):
+        return [(v, data["weight"]) for v, data in graph.adj[u].items()]
+
+    heuristic = straight_line if use_positions else None
+    return nearby.k_nearest(adjacency, start, dic_cafe, max_results, radius, heuristic)
+
+
+#ฟังก์ชันหาคาเฟ่ทั้งหมดที่ไปถึงได้ภายใน radius km จากหลายจุดในครั้งเดียว คืน {origin: Reachability}
+def find_reachable_cafes(origins, radius):
+    graph = routing_graph()
+
+    # จุดที่ซ้ำคำนวณครั้งเดียว และรายการเพื่อนบ้านของแต่ละโหนดสร้างครั้งเดียวใช้ร่วมกันทุก origin
+    neighbours = {}
+    if isinstance(graph, CSRGraph):
+        def adjacency(u):
+            if u not in neighbours:
+                neighbours[u] = list(graph.edges_from(u))
+            return neighbours[u]
+    else:
+        def adjacency(u):
+            if u not in neighbours:
+                neighbours[u] = [(v, data["weight"]) for v, data in graph.adj[u].items()]
+            return neighbours[u]
+
+    results = {}
+    for origin in dict.fromkeys(origins):
+        if isinstance(graph, CSRGraph):
+            names = graph.names
+            found = nearby.reachable(adjacency, graph.node_id(origin), radius)
+            results[origin] = nearby.Reachability(
+                origin,
+                radius,
+                {names[u]: d for u, d in found.distances.items()},
+                {names[v]: names[u] for v, u in found.pred.items()},
+            )
+        else:
+            results[origin] = nearby.reachable(adjacency, origin, radius)
+    return results
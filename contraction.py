@@ -0,0 +1,230 @@
+"""
+Contraction hierarchy: จัดลำดับโหนด + เพิ่มเส้นทางลัด (shortcut) ล่วงหน้า
+แล้วตอบระยะทางจุดต่อจุดด้วยการค้นหาขึ้นอย่างเดียว (upward search) จากทั้งสองฝั่ง
+"""
+import json
+import math
+from heapq import heapify, heappop, heappush
+
+import numpy as np
+
+WITNESS_SETTLE_LIMIT = 200   # จำนวนโหนดสูงสุดที่ witness search จะ settle ก่อนยอมเพิ่ม shortcut
+
+
+class ContractionHierarchy:
+    def __init__(self, names, rank, indptr, indices, weights, via, graph_hash=None):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.rank = rank
+        self.graph_hash = graph_hash
+        # upward graph: แต่ละโหนดเก็บเฉพาะเส้นทางไปยังโหนดที่ rank สูงกว่า (via = โหนดกลางของ shortcut หรือ -1)
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.via = via
+        self._indptr = memoryview(indptr)
+        self._indices = memoryview(indices)
+        self._weights = memoryview(weights)
+        self._via = memoryview(via)
+        self._spaces = {}
+
+    # 🔹 สร้างจากกราฟ (networkx.Graph หรือ CSRGraph: ใช้ nodes และ edges(data="weight"))
+    @classmethod
+    def build(cls, graph, graph_hash=None):
+        names = list(graph.nodes)
+        ids = {name: i for i, name in enumerate(names)}
+        n = len(names)
+        adj = [dict() for _ in range(n)]
+        via = {}
+        for u, v, weight in graph.edges(data="weight"):
+            u, v = ids[u], ids[v]
+            if u != v and weight < adj[u].get(v, math.inf):
+                adj[u][v] = adj[v][u] = weight
+
+        contracted = bytearray(n)
+        deleted_neighbours = [0] * n
+        rank = np.zeros(n, dtype=np.int64)
+
+        def witness_distances(source, skip, limit):
+            best = {source: 0}
+            heap = [(0, source)]
+            settled = 0
+            while heap and settled < WITNESS_SETTLE_LIMIT:
+                d, u = heappop(heap)
+                if d > best.get(u, math.inf) or d > limit:
+                    continue
+                settled += 1
+                for v, weight in adj[u].items():
+                    nd = d + weight
+                    if v != skip and not contracted[v] and nd < best.get(v, math.inf):
+                        best[v] = nd
+                        heappush(heap, (nd, v))
+            return best
+
+        # shortcut ที่ต้องเพิ่มถ้าตัดโหนด u ออก [(a, b, weight), ...]
+        def shortcuts_for(u):
+            neighbours = [(v, weight) for v, weight in adj[u].items() if not contracted[v]]
+            shortcuts = []
+            for i, (a, wa) in enumerate(neighbours):
+                rest = neighbours[i + 1:]
+                if not rest:
+                    break
+                witness = witness_distances(a, u, wa + max(wb for _, wb in rest))
+                for b, wb in rest:
+                    if witness.get(b, math.inf) > wa + wb:
+                        shortcuts.append((a, b, wa + wb))
+            return shortcuts
+
+        def priority(u):
+            degree = sum(1 for v in adj[u] if not contracted[v])
+            return len(shortcuts_for(u)) - degree + deleted_neighbours[u]
+
+        # เลือกโหนดที่ "ถูก" ที่สุดก่อน (edge difference) แบบ lazy update
+        heap = [(priority(u), u) for u in range(n)]
+        heapify(heap)
+        order = 0
+        while heap:
+            _, u = heappop(heap)
+            if contracted[u]:
+                continue
+            current = priority(u)
+            if heap and current > heap[0][0]:
+                heappush(heap, (current, u))
+                continue
+
+            for a, b, weight in shortcuts_for(u):
+                if weight < adj[a].get(b, math.inf):
+                    adj[a][b] = adj[b][a] = weight
+                    via[min(a, b), max(a, b)] = u
+            contracted[u] = 1
+            rank[u] = order
+            order += 1
+            for v in adj[u]:
+                if not contracted[v]:
+                    deleted_neighbours[v] += 1
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indices, weights, vias = [], [], []
+        for u in range(n):
+            for v, weight in adj[u].items():
+                if rank[v] > rank[u]:
+                    indices.append(v)
+                    weights.append(weight)
+                    vias.append(via.get((min(u, v), max(u, v)), -1))
+            indptr[u + 1] = len(indices)
+
+        weight_dtype = np.int64 if all(float(w).is_integer() for w in weights) else np.float64
+        return cls(
+            names,
+            rank,
+            indptr,
+            np.array(indices, dtype=np.int32),
+            np.array(weights, dtype=weight_dtype),
+            np.array(vias, dtype=np.int32),
+            graph_hash,
+        )
+
+    # 🔹 บันทึก/เปิดจากไฟล์ .npz
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                rank=self.rank,
+                indptr=self.indptr,
+                indices=self.indices,
+                weights=self.weights,
+                via=self.via,
+                meta=np.array(json.dumps({"names": self.names, "graph_hash": self.graph_hash})),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(
+                meta["names"],
+                data["rank"],
+                data["indptr"],
+                data["indices"],
+                data["weights"],
+                data["via"],
+                meta["graph_hash"],
+            )
+
+    # upward search ทั้งหมดจากโหนด u: {v: (ระยะทาง, โหนดก่อนหน้า)}
+    # กราฟไม่มีทิศทาง ฝั่ง source และ target จึงใช้ search space ชุดเดียวกันได้
+    def search_space(self, u):
+        space = self._spaces.get(u)
+        if space is not None:
+            return space
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        space = {}
+        best = {u: (0, -1)}
+        heap = [(0, u)]
+        while heap:
+            d, x = heappop(heap)
+            if x in space:
+                continue
+            space[x] = best[x]
+            for k in range(indptr[x], indptr[x + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if v not in space and nd < best.get(v, (math.inf,))[0]:
+                    best[v] = (nd, x)
+                    heappush(heap, (nd, v))
+        if len(self._spaces) > 4096:
+            self._spaces.clear()
+        self._spaces[u] = space
+        return space
+
+    def _meet(self, source, target):
+        forward, backward = self.search_space(source), self.search_space(target)
+        if len(backward) < len(forward):
+            forward, backward = backward, forward
+        best, meet = math.inf, -1
+        for v, (d, _) in forward.items():
+            other = backward.get(v)
+            if other is not None and d + other[0] < best:
+                best, meet = d + other[0], v
+        return best, meet
+
+    def distance(self, source, target):
+        return self._meet(self.ids[source], self.ids[target])[0]
+
+    # ตารางระยะทาง (many-to-many): search space ของแต่ละโหนดคำนวณครั้งเดียว
+    def distance_table(self, nodes):
+        ids = [self.ids[node] for node in nodes]
+        return [[0 if s == t else self._meet(s, t)[0] for t in ids] for s in ids]
+
+    # 🔹 เส้นทางจริง: ต่อ upward path ทั้งสองฝั่งแล้วแตก shortcut ออกเป็นเส้นทางเดิม
+    def shortest_path(self, source, target):
+        s, t = self.ids[source], self.ids[target]
+        distance, meet = self._meet(s, t)
+        if meet < 0:
+            return math.inf, None
+
+        up = [meet]
+        while self.search_space(s)[up[-1]][1] >= 0:
+            up.append(self.search_space(s)[up[-1]][1])
+        up.reverse()
+        down = [meet]
+        while self.search_space(t)[down[-1]][1] >= 0:
+            down.append(self.search_space(t)[down[-1]][1])
+
+        hops = up + down[1:]
+        path = [hops[0]]
+        for a, b in zip(hops, hops[1:]):
+            path.extend(self._unpack(a, b)[1:])
+        return distance, [self.names[u] for u in path]
+
+    def _unpack(self, a, b):
+        low, high = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        for k in range(self._indptr[low], self._indptr[low + 1]):
+            if self._indices[k] == high:
+                middle = self._via[k]
+                break
+        else:
+            raise KeyError(f"No hierarchy edge {a}-{b}")
+        if middle < 0:
+            return [a, b]
+        return self._unpack(a, middle) + self._unpack(middle, b)[1:]
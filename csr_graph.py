@@ -0,0 +1,226 @@
+"""
+กราฟแบบ CSR (indptr/indices/weights) ใช้ id เป็นจำนวนเต็ม สำหรับกราฟถนนขนาดใหญ่
+"""
+import copy
+from array import array
+from collections.abc import Mapping
+from heapq import heappop, heappush
+
+import numpy as np
+
+
+class CSRGraph:
+    def __init__(self, names, indptr, indices, weights, labels=None, coords=None):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.labels = labels or {}    # ชื่อเต็มของคาเฟ่ {node: name}
+        self.coords = coords          # พิกัด (n, 2) เรียงตาม id หรือ None
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        # memoryview indexing returns plain ints/floats, much cheaper per hop than numpy scalars
+        self._indptr = memoryview(indptr)
+        self._indices = memoryview(indices)
+        self._weights = memoryview(weights)
+
+    # สร้างจากเส้นทาง (u, v, weight) แบบไม่มีทิศทาง รับ iterable ได้โดยไม่ต้องเป็น list
+    @classmethod
+    def from_edges(cls, edges, nodes=()):
+        names = list(dict.fromkeys(nodes))
+        ids = {name: i for i, name in enumerate(names)}
+
+        def node_id(name):
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+            return ids[name]
+
+        sources, targets, weights = array("q"), array("q"), array("q")
+        for u, v, weight in edges:
+            u, v = node_id(u), node_id(v)
+            # ทศนิยมทุกค่า (รวม 7.0) เก็บเป็น double เพราะ array("q") รับ float ไม่ได้
+            if weights.typecode == "q" and isinstance(weight, float):
+                weights = array("d", weights)
+            sources.extend((u, v))
+            targets.extend((v, u))
+            weights.extend((weight, weight))
+
+        sources = np.frombuffer(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(names)), out=indptr[1:])
+        indices = np.frombuffer(targets, dtype=np.int64)[order].astype(np.int32)
+        weights = np.frombuffer(weights, dtype=np.int64 if weights.typecode == "q" else np.float64)[order]
+        return cls(names, indptr, indices, weights)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        return cls.from_edges(graph.edges(data="weight", default=1), graph.nodes)
+
+    # --- ให้ใช้แทน networkx.Graph ได้ในจุดที่อ่านโหนด/เส้นทาง ---
+    @property
+    def nodes(self):
+        return self.names
+
+    def edges(self, data="weight"):
+        for u in range(len(self.names)):
+            for k in range(self._indptr[u], self._indptr[u + 1]):
+                v = self._indices[k]
+                if u < v:
+                    yield self.names[u], self.names[v], self._weights[k]
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.names)
+
+    def node_id(self, name):
+        if name not in self.ids:
+            raise KeyError(f"Node {name} not in graph")
+        return self.ids[name]
+
+    # ตำแหน่งของเส้น a → b ใน indices/weights (id) หรือ None
+    def _slot(self, a, b):
+        start, end = self._indptr[a], self._indptr[a + 1]
+        found = np.flatnonzero(np.asarray(self.indices[start:end]) == b)
+        return start + int(found[0]) if len(found) else None
+
+    # 🔹 กราฟใหม่ที่เส้น u-v ยาว weight (None = ลบเส้น) โดยไม่สร้างจากเส้นทางทั้งหมดใหม่
+    # ถ้าโครงสร้างไม่เปลี่ยนใช้ names/indptr/indices ร่วมกับกราฟเดิม และกราฟเดิมไม่ถูกแก้
+    def with_edge(self, u, v, weight):
+        a, b = self.node_id(u), self.node_id(v)
+        slots = [self._slot(a, b), self._slot(b, a)]
+        dtype = self.weights.dtype
+        if isinstance(weight, float) and dtype.kind != "f":
+            dtype = np.dtype(np.float64)
+        weights = np.asarray(self.weights, dtype=dtype)
+        indptr, indices = self.indptr, self.indices
+
+        if slots[0] is not None and weight is not None:
+            weights = np.array(weights)
+            weights[slots] = weight
+        elif slots[0] is not None:
+            indices, weights = np.delete(indices, slots), np.delete(weights, slots)
+            indptr = np.array(indptr, dtype=np.int64)
+            indptr[a + 1:] -= 1
+            indptr[b + 1:] -= 1
+        elif weight is not None:
+            ends = [self._indptr[a + 1], self._indptr[b + 1]]
+            indices = np.insert(indices, ends, [b, a]).astype(indices.dtype, copy=False)
+            weights = np.insert(weights, ends, [weight, weight])
+            indptr = np.array(indptr, dtype=np.int64)
+            indptr[a + 1:] += 1
+            indptr[b + 1:] += 1
+
+        graph = copy.copy(self)
+        graph.indptr, graph.indices, graph.weights = indptr, indices, weights
+        graph._indptr, graph._indices, graph._weights = memoryview(indptr), memoryview(indices), memoryview(weights)
+        return graph
+
+    # เพื่อนบ้านตาม id [(v, weight), ...]
+    def edges_from(self, u):
+        start, end = self._indptr[u], self._indptr[u + 1]
+        return zip(self._indices[start:end], self._weights[start:end])
+
+    # 🔹 Dijkstra บน array (id ล้วน)
+    # หยุดเมื่อ settle ครบทุก targets หรือระยะเกิน cutoff; คืน (dist, pred) เฉพาะโหนดที่ settle แล้ว
+    def dijkstra(self, source, targets=None, cutoff=None):
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        remaining = set(targets) if targets is not None else None
+        inf = float("inf")
+        limit = inf if cutoff is None else cutoff
+        # dense per-search arrays: list indexing is cheaper than dict lookups in the inner loop
+        best = [inf] * len(self.names)
+        pred = [-1] * len(self.names)
+        done = bytearray(len(self.names))
+        best[source] = 0
+        settled = []
+        heap = [(0, source)]
+
+        while heap:
+            d, u = heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            settled.append(u)
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < best[v] and nd <= limit and not done[v]:
+                    best[v] = nd
+                    pred[v] = u
+                    heappush(heap, (nd, v))
+
+        return {v: best[v] for v in settled}, {v: pred[v] for v in settled}
+
+    # 🔹 Bidirectional Dijkstra สำหรับจุดหมายเดียว คืน (ระยะทาง, [id, ...]) หรือ (inf, None)
+    def bidirectional(self, source, target):
+        if source == target:
+            return 0, [source]
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        inf = float("inf")
+        dist = ({source: 0}, {target: 0})
+        pred = ({source: -1}, {target: -1})
+        done = (set(), set())
+        heaps = ([(0, source)], [(0, target)])
+        best, meet = inf, -1
+
+        # stop once the two frontiers together cannot beat the best meeting point
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            d, u = heappop(heaps[side])
+            if u in done[side]:
+                continue
+            done[side].add(u)
+            mine, other = dist[side], dist[1 - side]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < mine.get(v, inf):
+                    mine[v] = nd
+                    pred[side][v] = u
+                    heappush(heaps[side], (nd, v))
+                if v in other and mine[v] + other[v] < best:
+                    best, meet = mine[v] + other[v], v
+
+        if meet < 0:
+            return inf, None
+        path = [meet]
+        while pred[0][path[-1]] >= 0:
+            path.append(pred[0][path[-1]])
+        path.reverse()
+        while pred[1][path[-1]] >= 0:
+            path.append(pred[1][path[-1]])
+        return best, path
+
+    # รูปแบบเดียวกับ nx.dijkstra_predecessor_and_distance แต่ใช้ชื่อโหนด
+    def predecessor_and_distance(self, source, targets=None, cutoff=None):
+        target_ids = None if targets is None else [self.node_id(target) for target in targets]
+        dist, pred = self.dijkstra(self.node_id(source), target_ids, cutoff)
+        return NamedView(self, pred, self._pred_names), NamedView(self, dist)
+
+    def _pred_names(self, u):
+        return [self.names[u]] if u >= 0 else []
+
+
+# มองผลลัพธ์ที่ key เป็น id ด้วยชื่อโหนด โดยไม่ต้องแปลงทั้ง dict (ผลของ Dijkstra อาจมีหลายแสนโหนด)
+class NamedView(Mapping):
+    def __init__(self, graph, values, convert=None):
+        self._graph = graph
+        self._values = values
+        self._convert = convert
+
+    def __getitem__(self, name):
+        value = self._values[self._graph.ids[name]]
+        return self._convert(value) if self._convert is not None else value
+
+    def __iter__(self):
+        return (self._graph.names[v] for v in self._values)
+
+    def __len__(self):
+        return len(self._values)
@@ -0,0 +1,193 @@
+"""
+โหลดคาเฟ่และเส้นทางจากไฟล์ CSV/JSONL แบบทีละบรรทัด และบันทึก/เปิด snapshot แบบ binary (memory-map)
+
+nodes: id,name,x,y   (name, x, y ไม่บังคับ; โหนดที่มี name คือคาเฟ่ ที่เหลือเป็นทางแยก)
+edges: source,target,weight
+"""
+import csv
+import json
+import math
+import os
+
+import networkx as nx
+import numpy as np
+
+from csr_graph import CSRGraph
+
+SNAPSHOT_MAGIC = b"CAFECSR1"
+
+
+def _rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, row
+
+
+# ค่าว่าง/ไม่มีคือ None หรือ "" เท่านั้น (id ใน JSONL เป็นเลข 0 ได้)
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _number(value, path, line_no, field):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{path}:{line_no}: {field} is not a number: {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{path}:{line_no}: {field} must be finite")
+    return int(number) if number.is_integer() else number
+
+
+# yield (id, name หรือ None, (x, y) หรือ None)
+def iter_nodes(path):
+    seen = set()
+    for line_no, row in _rows(path):
+        node = _text(row.get("id"))
+        if not node:
+            raise ValueError(f"{path}:{line_no}: missing id")
+        if node in seen:
+            raise ValueError(f"{path}:{line_no}: duplicate id {node}")
+        seen.add(node)
+
+        xy = None
+        if row.get("x") not in (None, "") and row.get("y") not in (None, ""):
+            xy = (_number(row["x"], path, line_no, "x"), _number(row["y"], path, line_no, "y"))
+        yield node, (row.get("name") or None), xy
+
+
+# yield (source, target, weight); ถ้าให้ nodes มาด้วยจะตรวจว่าทุกปลายทางมีอยู่จริง
+# เส้นซ้ำ (รวม P,Q กับ Q,P) ไม่รับ เพราะ networkx เก็บค่าสุดท้ายแต่ CSR เก็บทุกเส้น ผลจะต่างกัน
+def iter_edges(path, nodes=None):
+    seen = set()
+    for line_no, row in _rows(path):
+        u = _text(row.get("source"))
+        v = _text(row.get("target"))
+        if not u or not v:
+            raise ValueError(f"{path}:{line_no}: missing source/target")
+        if u == v:
+            raise ValueError(f"{path}:{line_no}: self loop on {u}")
+        key = (u, v) if u < v else (v, u)
+        if key in seen:
+            raise ValueError(f"{path}:{line_no}: duplicate edge {u}-{v}")
+        seen.add(key)
+        if nodes is not None and (u not in nodes or v not in nodes):
+            raise ValueError(f"{path}:{line_no}: unknown node in edge {u}-{v}")
+        weight = _number(row.get("weight"), path, line_no, "weight")
+        if weight < 0:
+            raise ValueError(f"{path}:{line_no}: negative weight {weight}")
+        yield u, v, weight
+
+
+# 🔹 สร้าง networkx.Graph (node attribute: name, pos)
+def load_graph(nodes_path, edges_path):
+    graph = nx.Graph()
+    for node, name, xy in iter_nodes(nodes_path):
+        graph.add_node(node)
+        if name is not None:
+            graph.nodes[node]["name"] = name
+        if xy is not None:
+            graph.nodes[node]["pos"] = xy
+    for u, v, weight in iter_edges(edges_path, graph):
+        graph.add_edge(u, v, weight=weight)
+    return graph
+
+
+# 🔹 สร้าง CSRGraph ตรงจากไฟล์ (ไม่ผ่าน networkx)
+def load_csr(nodes_path, edges_path):
+    names, labels, coords = [], {}, []
+    for node, name, xy in iter_nodes(nodes_path):
+        names.append(node)
+        if name is not None:
+            labels[node] = name
+        coords.append(xy if xy is not None else (math.nan, math.nan))
+
+    graph = CSRGraph.from_edges(iter_edges(edges_path, set(names)), names)
+    graph.labels = labels
+    if any(not math.isnan(x) for x, _ in coords):
+        graph.coords = np.array(coords, dtype=np.float64)
+    return graph
+
+
+# 🔹 สร้าง networkx.Graph จาก CSRGraph (เช่นที่เปิดจาก snapshot) ได้ attribute แบบเดียวกับ load_graph
+def to_networkx(csr):
+    graph = nx.Graph()
+    graph.add_nodes_from(csr.names)
+    nx.set_node_attributes(graph, csr.labels, "name")
+    if csr.coords is not None:
+        nx.set_node_attributes(
+            graph, {name: (x, y) for name, (x, y) in zip(csr.names, csr.coords.tolist()) if not math.isnan(x)}, "pos"
+        )
+    graph.add_weighted_edges_from(csr.edges())
+    return graph
+
+
+# snapshot ใช้ได้เมื่อใหม่กว่าไฟล์ต้นทางทุกไฟล์
+def snapshot_is_fresh(path, *sources):
+    return os.path.exists(path) and all(os.path.getmtime(path) >= os.path.getmtime(source) for source in sources)
+
+
+# 🔹 snapshot: MAGIC | ขนาด header (uint64) | header JSON | indptr | indices | weights | coords
+# array ทุกก้อนเริ่มที่ offset หาร 8 ลงตัว เพื่อให้ np.memmap เปิดได้ตรงๆ
+def save_snapshot(graph, path):
+    arrays = [
+        ("indptr", np.ascontiguousarray(graph.indptr, dtype=np.int64)),
+        ("indices", np.ascontiguousarray(graph.indices, dtype=np.int32)),
+        ("weights", np.ascontiguousarray(graph.weights)),
+    ]
+    if graph.coords is not None:
+        arrays.append(("coords", np.ascontiguousarray(graph.coords, dtype=np.float64)))
+
+    header = {
+        "names": graph.names,
+        "labels": [graph.labels.get(name) for name in graph.names],
+        "arrays": [],
+    }
+    for name, data in arrays:
+        header["arrays"].append({"name": name, "dtype": data.dtype.str, "shape": list(data.shape)})
+    body = json.dumps(header).encode("utf-8")
+
+    # เขียนไฟล์ชั่วคราวแล้วแทนที่ทีเดียว process อื่นที่เปิด snapshot เดิมอยู่จะไม่เห็นไฟล์ครึ่ง ๆ
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(np.uint64(len(body)).tobytes())
+        f.write(body)
+        for _, data in arrays:
+            f.write(b"\0" * (-f.tell() % 8))
+            f.write(data.tobytes())
+    os.replace(temp, path)
+
+
+def load_snapshot(path):
+    with open(path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path}: not a cafe graph snapshot")
+        size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(size))
+        offset = f.tell()
+
+    arrays = {}
+    for spec in header["arrays"]:
+        offset += -offset % 8
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape))
+        arrays[spec["name"]] = (
+            np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape) if count else np.zeros(shape, dtype)
+        )
+        offset += count * dtype.itemsize
+
+    names = header["names"]
+    return CSRGraph(
+        names,
+        arrays["indptr"],
+        arrays["indices"],
+        arrays["weights"],
+        labels={name: label for name, label in zip(names, header["labels"]) if label is not None},
+        coords=arrays.get("coords"),
+    )
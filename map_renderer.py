@@ -0,0 +1,156 @@
+"""
+วาดแผนที่คาเฟ่โดยสร้างแผนที่พื้นฐานครั้งเดียว แล้วแต่ละคำขอวาดทับ (blit) แค่เส้นทาง/สีที่เปลี่ยน
+ใช้ได้ทั้งแบบไม่มีหน้าต่าง (Agg) และหน้าต่างแผนที่ที่เปิดค้างไว้
+"""
+import io
+import os
+import networkx as nx
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+
+# ถนนไม่เกินค่านี้แสดงชื่อทุกโหนดและระยะทางทุกถนนบนแผนที่พื้นฐาน
+# เกินแล้ว (แผนที่ใหญ่) วาดถนน/โหนดเป็นเส้นบางและจุดเล็ก และแสดงป้ายเฉพาะโหนด/ถนนที่อยู่ในคำขอ
+LABEL_EDGE_LIMIT = 200
+
+
+class MapRenderer:
+    # figure: ใช้หน้าต่างของ pyplot ที่มีอยู่ ถ้าไม่ระบุจะสร้าง Figure แบบ Agg (ไม่มีหน้าต่าง)
+    def __init__(self, graph, pos, labels=None, node_size=1500, base_color="lightgray", figsize=(8, 8), dpi=100, figure=None, label_limit=LABEL_EDGE_LIMIT):
+        self.graph = graph
+        self.pos = pos
+        self.labels = labels
+        self.label_limit = label_limit
+        self.detailed = graph.number_of_edges() <= label_limit
+        if not self.detailed:
+            node_size = min(node_size, 300)
+        if figure is None:
+            figure = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(figure)
+        self.figure = figure
+        self.canvas = figure.canvas
+        self.ax = self.figure.add_axes((0.05, 0.18, 0.9, 0.72))
+        self.ax.set_axis_off()
+
+        # 🔹 ชั้นพื้นฐาน: ถนน โหนด ชื่อคาเฟ่ และระยะทางของทุกถนน (วาดครั้งเดียว, แผนที่ใหญ่ไม่มีป้าย)
+        self.edge_index = {}
+        segments = []
+        for u, v in graph.edges():
+            self.edge_index[(u, v)] = len(segments)
+            if not graph.is_directed():
+                self.edge_index[(v, u)] = len(segments)
+            segments.append((pos[u], pos[v]))
+        self.ax.add_collection(LineCollection(segments, colors=base_color, linewidths=2 if self.detailed else 0.5, zorder=1))
+
+        nodes = list(graph.nodes())
+        self.ax.scatter([pos[n][0] for n in nodes], [pos[n][1] for n in nodes], s=node_size if self.detailed else 4, c=base_color, zorder=2)
+        self.node_labels, self.edge_labels = {}, {}
+        if self.detailed:
+            self.node_labels = nx.draw_networkx_labels(graph, pos, labels=labels, font_size=10, font_color="black", ax=self.ax)
+            edge_labels = {(u, v): data["weight"] for u, v, data in graph.edges(data=True)}
+            self.edge_labels = nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, font_size=10, ax=self.ax)
+        self.ax.margins(0.2)
+        self.ax.autoscale_view()
+
+        # 🔹 ชั้นที่เปลี่ยนตามคำขอ (animated: ไม่ถูกวาดลงภาพพื้นฐาน)
+        self.path_artist = self.ax.add_collection(LineCollection([], linewidths=2, zorder=1.5, animated=True))
+        self.marked_artist = self.ax.scatter([], [], s=node_size, zorder=2.5, animated=True)
+        self.title = self.figure.suptitle("", fontsize=18, fontweight="bold", color="darkblue", animated=True)
+        self.captions = [self.figure.text(0.5, y, "", fontsize=12, color="gray", ha="center", animated=True) for y in (0.13, 0.03)]
+        self.overlay_texts = []
+        self.label_texts = []   # ป้ายที่สร้างตามคำขอบนแผนที่ใหญ่ (animated)
+        self.background = None
+
+        # วาดใหม่ทั้งภาพเมื่อไร (เช่นปรับขนาดหน้าต่าง) ให้เก็บภาพพื้นฐานใหม่แล้ววาดชั้นบนทับ
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    # เปลี่ยนสีเฉพาะโหนด/ถนนที่ระบุ ({node: สี}, {(u, v): สี}) และข้อความหัวเรื่อง/คำบรรยาย
+    def overlay(self, node_colors=None, edge_colors=None, title="", captions=()):
+        node_colors = dict(node_colors or {})
+        edge_colors = {edge: color for edge, color in dict(edge_colors or {}).items() if edge in self.edge_index}
+
+        self.marked_artist.set_offsets(np.array([self.pos[n] for n in node_colors], dtype=float).reshape(-1, 2))
+        self.marked_artist.set_facecolor(list(node_colors.values()))
+        self.path_artist.set_segments([(self.pos[u], self.pos[v]) for u, v in edge_colors])
+        self.path_artist.set_color(list(edge_colors.values()))
+
+        self.title.set_text(title)
+        captions = list(captions)
+        for i, artist in enumerate(self.captions):
+            artist.set_text(captions[i] if i < len(captions) else "")
+
+        # ป้ายชื่อ/ระยะทางที่ถูกทับต้องวาดซ้ำด้านบน
+        if not self.detailed:
+            self._label(node_colors, edge_colors)
+        self.overlay_texts = [self.node_labels[n] for n in node_colors if n in self.node_labels]
+        for u, v in edge_colors:
+            text = self.edge_labels.get((u, v)) or self.edge_labels.get((v, u))
+            if text is not None:
+                self.overlay_texts.append(text)
+        return self
+
+    # แผนที่ใหญ่: สร้างป้ายเฉพาะโหนด/ถนนของคำขอนี้ (ไม่เกิน label_limit อย่างละรายการ)
+    def _label(self, nodes, edges):
+        for text in self.label_texts:
+            text.remove()
+        self.label_texts = []
+        self.node_labels, self.edge_labels = {}, {}
+        for n in list(nodes)[:self.label_limit]:
+            if self.labels is None or n in self.labels:
+                x, y = self.pos[n]
+                label = self.labels[n] if self.labels is not None else n
+                self.node_labels[n] = self.ax.text(x, y, label, fontsize=8, ha="center", va="center", zorder=3, animated=True)
+        for u, v in list(edges)[:self.label_limit]:
+            (x1, y1), (x2, y2) = self.pos[u], self.pos[v]
+            self.edge_labels[(u, v)] = self.ax.text(
+                (x1 + x2) / 2, (y1 + y2) / 2, self.graph[u][v]["weight"], fontsize=7, ha="center", va="center", zorder=3, animated=True
+            )
+        self.label_texts = [*self.node_labels.values(), *self.edge_labels.values()]
+
+    def _on_draw(self, event):
+        if event.canvas is not self.canvas:  # savefig แบบเวกเตอร์ (SVG/PDF) ใช้ canvas ชั่วคราว
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_overlay()
+
+    def _draw_overlay(self):
+        for artist in (self.path_artist, self.marked_artist, *self.overlay_texts, self.title, *self.captions):
+            self.figure.draw_artist(artist)
+
+    def _blit(self):
+        if self.background is None:
+            self.canvas.draw()  # _on_draw เก็บภาพพื้นฐานและวาดชั้นบนให้
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_overlay()
+
+    # อัปเดตหน้าต่างที่เปิดอยู่ (วาดเฉพาะชั้นบน ไม่วาดแผนที่ทั้งหมดใหม่)
+    def refresh(self):
+        self._blit()
+        self.canvas.blit(self.figure.bbox)
+        self.canvas.flush_events()
+        return self
+
+    # เขียนภาพลงไฟล์/ออบเจ็กต์ไฟล์ หรือคืนเป็น bytes เมื่อ out เป็น None
+    # PNG ใช้ภาพพื้นฐานที่เก็บไว้ ส่วน SVG/PDF (เวกเตอร์) ต้องวาดทั้งภาพใหม่
+    def save(self, out=None, format=None):
+        if format is None:
+            format = os.path.splitext(out)[1][1:].lower() if isinstance(out, (str, os.PathLike)) else "png"
+        target = io.BytesIO() if out is None else out
+
+        if format == "png":
+            self._blit()
+            imsave(target, np.asarray(self.canvas.buffer_rgba()), format="png")
+        else:
+            animated = [self.path_artist, self.marked_artist, *self.label_texts, self.title, *self.captions]
+            for artist in animated:
+                artist.set_animated(False)
+            try:
+                self.figure.savefig(target, format=format)
+            finally:
+                for artist in animated:
+                    artist.set_animated(True)
+
+        return target.getvalue() if out is None else None
@@ -0,0 +1,111 @@
+"""
+ค้นหาคาเฟ่ใกล้เคียงตามระยะทางบนถนน (Dijkstra แบบจำกัดจำนวน/รัศมี) และ KD-tree ของพิกัดโหนด
+"""
+import math
+from heapq import heappop, heappush
+
+
+# 🔹 KD-tree 2 มิติ สำหรับหาจุดที่ใกล้ที่สุดตามเส้นตรง
+class KDTree:
+    def __init__(self, points):
+        # points: [(x, y, item), ...]
+        self._root = self._build(list(points), 0)
+
+    def _build(self, points, axis):
+        if not points:
+            return None
+        points.sort(key=lambda p: p[axis])
+        mid = len(points) // 2
+        return (
+            points[mid],
+            axis,
+            self._build(points[:mid], 1 - axis),
+            self._build(points[mid + 1:], 1 - axis),
+        )
+
+    # คืน (ระยะทางเส้นตรง, item) ของจุดที่ใกล้ที่สุด
+    def nearest(self, x, y):
+        best = (math.inf, None)
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            (px, py, item), axis, left, right = node
+            d = math.hypot(px - x, py - y)
+            if d < best[0]:
+                best = (d, item)
+            diff = (x - px) if axis == 0 else (y - py)
+            near, far = (left, right) if diff < 0 else (right, left)
+            if abs(diff) < best[0]:
+                stack.append(far)
+            stack.append(near)
+        return best
+
+
+# 🔹 k คาเฟ่ที่ใกล้ที่สุดตามระยะทางบนถนน
+# adjacency(u) -> [(v, weight), ...]
+# heuristic(u) ต้องไม่เกินระยะทางจริงจาก u ถึงคาเฟ่ที่ใกล้ที่สุด (เช่น ระยะเส้นตรงเมื่อพิกัดเป็นหน่วยเดียวกับ weight)
+# คาเฟ่มี heuristic เป็น 0 จึงถูกดึงออกจาก heap ตามลำดับระยะทางจริงเสมอ
+# ไม่คืน source เองแม้ source จะเป็นคาเฟ่
+def k_nearest(adjacency, source, targets, k, radius=None, heuristic=None):
+    limit = math.inf if radius is None else radius
+    best = {source: 0}
+    settled = set()
+    found = []
+    heap = [(heuristic(source) if heuristic else 0, 0, source)]
+
+    while heap and len(found) < k:
+        _, d, u = heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u != source and u in targets:
+            found.append((u, d))
+        for v, weight in adjacency(u):
+            nd = d + weight
+            if nd > limit or v in settled or nd >= best.get(v, math.inf):
+                continue
+            best[v] = nd
+            heappush(heap, (nd + (heuristic(v) if heuristic else 0), nd, v))
+
+    return found
+
+
+# 🔹 ทุกโหนดที่ไปถึงได้ภายในรัศมี (isochrone)
+class Reachability:
+    def __init__(self, origin, radius, distances, pred):
+        self.origin = origin
+        self.radius = radius
+        self.distances = distances   # {node: distance} เรียงจากใกล้ไปไกลตามลำดับที่ Dijkstra settle
+        self.pred = pred
+
+    def cafes(self, cafes):
+        return [(node, d) for node, d in self.distances.items() if node != self.origin and node in cafes]
+
+    # เส้นทางใน shortest-path tree ใช้ไฮไลต์ subgraph ที่ไปถึงได้โดยไม่ต้องค้นหาใหม่
+    def edges(self):
+        return [(self.pred[node], node) for node in self.distances if node != self.origin]
+
+
+# ไม่ต้อง sort ผลลัพธ์: โหนดถูก settle จาก heap ตามลำดับระยะทางอยู่แล้ว
+def reachable(adjacency, source, radius):
+    best = {source: 0}
+    pred = {}
+    distances = {}
+    heap = [(0, source)]
+
+    while heap:
+        d, u = heappop(heap)
+        if u in distances:
+            continue
+        distances[u] = d
+        for v, weight in adjacency(u):
+            nd = d + weight
+            if nd > radius or v in distances or nd >= best.get(v, math.inf):
+                continue
+            best[v] = nd
+            pred[v] = u
+            heappush(heap, (nd, v))
+
+    return Reachability(source, radius, distances, {v: pred[v] for v in distances if v != source})
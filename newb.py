@@ -2,73 +2,16 @@
 เส้นทางคาเฟ่ จังหวัดปราจีนบุรี
 """
 import networkx as nx
-import matplotlib.pyplot as plt
-from itertools import permutations
-
-# 🔹 สร้างกราฟ
-G = nx.Graph()
-
-dic_cafe = {
-    "A": "Myrrh Cafe Prachinburi",
-    "B": "Toast bar Cafe",
-    "C": "Noen Hom Cafe",
-    "D": "Rong See Coffee Prachinburi",
-    "E": "Homurumu Cafe",
-    "F": "Eto slowbar",
-    "G": "Nare Cafe",
-    "H": "VV Cafe & bistro",
-    "I": "Baan Fuangfah cafe"
-}
-
-cafes = ["A", "B", "C", "D", "E", "F", "G","H","I"]
-G.add_nodes_from(cafes)
-
-# เพิ่มข้อมูลชื่อคาเฟ่เป็น attribute ของแต่ละโหนด
-for cafe, name in dic_cafe.items():
-    G.nodes[cafe]["name"] = name
-
-edges = [
-    ("A", "B", 12),
-    ("A", "C", 10),
-    ("B", "C", 13),
-    ("B", "D", 7),
-    ("D", "G", 12),
-    ("E", "F", 9),
-    ("G", "H", 2),
-    ("G", "I", 5),
-    ("I", "E", 11),
-    ("I", "F", 3),
-    ("H", "I", 9),
-]
-G.add_weighted_edges_from(edges)
-
-# 🔹 ฟังก์ชันหาเส้นทางที่ดีที่สุด
-
-def find_best_shortest_path(start, destinations):
-    if len(destinations) == 1:
-        end = destinations[0]
-        path = nx.shortest_path(G, source=start, target=end, weight="weight")
-        distance = nx.shortest_path_length(G, source=start, target=end, weight="weight")
-        return path, distance
-    
-    best_path, best_distance = None, float("inf")
-
-    for perm in permutations(destinations):
-        path = [start]
-        total_distance = 0
-        current_location = start
-
-        for next_stop in perm:
-            sub_path = nx.shortest_path(G, source=current_location, target=next_stop, weight="weight")
-            sub_distance = nx.shortest_path_length(G, source=current_location, target=next_stop, weight="weight")
-            path.extend(sub_path[1:])
-            total_distance += sub_distance
-            current_location = next_stop
-
-        if total_distance < best_distance:
-            best_distance, best_path = total_distance, path
+import numpy as np
+import os
+from cafe_routes import (
+    G, dic_cafe, positions,
+    RouteSession, find_courier_routes, find_nearby_cafes, find_reachable_cafes,
+    graph_revision, load_cafes, network_graph, open_route_store,
+)
 
-    return best_path, best_distance
+# 🔹 การวาดแผนที่: matplotlib ถูกโหลดเมื่อวาดครั้งแรก (import ในฟังก์ชัน)
+# ส่วนคำนวณเส้นทางอยู่ใน cafe_routes ซึ่งไม่ต้องใช้ matplotlib เลย
 
 # Function to split text into lines if it exceeds a certain length
 def wrap_text(text, max_length=100):
@@ -86,43 +29,105 @@ def wrap_text(text, max_length=100):
     
     return "\n".join(lines)
 
-# Function to draw the shortest path with wrapped text
-def draw_shortest_path(path, total_distance):
-    plt.figure(figsize=(8, 8))
-    pos = {
-        "A":(2,6), "B":(1,3), "C":(-0.2,8), "D":(1,0),
-        "E":(7,1.2), "F":(4,4), "G":(3,-4), "H":(5,-5), "I":(3,2)
-    }
+# ถนนที่เห็นบนแผนที่ไม่เกินค่านี้จะแสดงรายละเอียดครบ (ชื่อทุกคาเฟ่ ระยะทางทุกถนน)
+# เกินแล้วแสดงเฉพาะบนเส้นทาง ส่วนที่เหลือวาดเป็นเส้น/จุดเล็ก ๆ
+LABEL_EDGE_LIMIT = 200
+
+# พิกัดโหนดและปลายถนนเป็น array สร้างครั้งเดียวต่อ revision ของกราฟ (เปลี่ยนเมื่อแก้เส้นทางด้วย)
+_map_arrays = None
+
+def map_arrays():
+    global _map_arrays
+    key = graph_revision()
+    if _map_arrays is None or _map_arrays["key"] != key:
+        nodes = list(G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        _map_arrays = {
+            "key": key,
+            "nodes": nodes,
+            "index": index,
+            "xy": np.array([positions[node] for node in nodes], dtype=float).reshape(-1, 2),
+            "ends": np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2),
+        }
+    return _map_arrays
 
-    destination_set = set(destinations) 
+
+# Function to draw the shortest path with wrapped text
+# destinations: จุดหมายที่ผู้ใช้เลือก (ไม่ระบุ = ปลายเส้นทาง) เหมือน route_overlay
+# crop: วาดเฉพาะบริเวณรอบเส้นทาง, label_limit: จำนวนถนนที่เห็นสูงสุดที่ยังแสดงป้ายครบ
+def draw_shortest_path(path, total_distance, destinations=None, crop=False, label_limit=LABEL_EDGE_LIMIT):
+    import matplotlib.pyplot as plt
+
+    ax = plt.figure(figsize=(8, 8)).add_axes((0, 0, 1, 1))  # เต็มภาพแบบเดียวกับ nx.draw
+    ax.set_axis_off()
+    pos = positions
+
+    arrays = map_arrays()
+    nodes, index, xy, ends = arrays["nodes"], arrays["index"], arrays["xy"], arrays["ends"]
+
+    # ตัดส่วนที่อยู่นอกกรอบของเส้นทาง (เผื่อขอบ 20%)
+    visible = np.ones(len(nodes), dtype=bool)
+    if crop:
+        corners = xy[[index[node] for node in path]]
+        low, high = corners.min(axis=0), corners.max(axis=0)
+        pad = (high - low).max() * 0.2 or 1.0
+        visible = np.all((xy >= low - pad) & (xy <= high + pad), axis=1)
+        ax.set_xlim(low[0] - pad, high[0] + pad)
+        ax.set_ylim(low[1] - pad, high[1] + pad)
+    visible_edges = ends[visible[ends[:, 0]] | visible[ends[:, 1]]]
+    detailed = len(visible_edges) <= label_limit
+
+    destinations = list(destinations or path[-1:])
+    destination_set = set(destinations)
+    path_set = set(path)
+    path_edges = list(zip(path, path[1:]))
+
+    # ถนนทั้งหมดเป็นเส้นเดียว (คั่นแต่ละถนนด้วย NaN) แล้ววาดเส้นทางทับ
+    roads = np.concatenate([xy[visible_edges], np.full((len(visible_edges), 1, 2), np.nan)], axis=1).reshape(-1, 2)
+    ax.plot(roads[:, 0], roads[:, 1], color="lightgray", linewidth=2 if detailed else 0.5, zorder=1)
+    route_xy = np.array([pos[node] for node in path], dtype=float)
+    ax.plot(route_xy[:, 0], route_xy[:, 1], color="lightgreen", linewidth=2, zorder=2)
+
+    # แผนที่ใหญ่: โหนดอื่นเป็นจุดเล็ก และขยายเฉพาะจุดเริ่มต้น/จุดหมาย (เส้นทางเห็นจากเส้นสีเขียว)
+    if detailed:
+        shown = [node for node in path_set | destination_set if node in index]
+        shown += [node for node, on in zip(nodes, visible) if on and node not in path_set and node not in destination_set]
+    else:
+        shown = [node for node in dict.fromkeys([path[0], *destinations]) if node in index]
+        background = xy[visible]
+        ax.scatter(background[:, 0], background[:, 1], s=4, c="lightgray", zorder=1)
     node_colors = [
-        "pink" if node == path[0] else 
+        "pink" if node == path[0] else
         "skyblue" if node in destination_set or node == destinations[-1] else
-        "lightgreen" if node in path else
+        "lightgreen" if node in path_set else
         "lightgray"
-        for node in G.nodes()
+        for node in shown
     ]
-    #node_colors = ["pink" if node == path[0] or node == path[-1] else "lightgreen" if node in path else "lightgray" for node in G.nodes()]
-    edge_colors = ["lightgreen" if (u, v) in zip(path, path[1:]) or (v, u) in zip(path, path[1:]) else "lightgray" for u, v in G.edges()]
-
-    # Draw the graph
-    nx.draw(G, pos, with_labels=False, node_size=1800, node_color=node_colors, font_size=15, font_weight="bold", edge_color=edge_colors, width=2)
+    ax.scatter([pos[node][0] for node in shown], [pos[node][1] for node in shown], s=1800 if detailed else 300, c=node_colors, zorder=3)
 
     # Adjust labels position slightly so they don't overlap with nodes
-    labels = nx.get_node_attributes(G, "name")
-    label_pos = {node: (x + 0.05, y + 0.05) if node == path[0] else (x, y) for node, (x, y) in pos.items()}  # Slight offset
-    nx.draw_networkx_labels(G, label_pos, labels=labels, font_size=10, font_color="black")
-
-    # Draw edge labels (distances)
-    edge_labels = {(u, v): G[u][v]["weight"] for u, v in G.edges()}
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=10)
+    names = nx.get_node_attributes(G, "name")
+    labels = {node: names[node] for node in shown if node in names}
+    label_pos = {node: (pos[node][0] + 0.05, pos[node][1] + 0.05) if node == path[0] else pos[node] for node in labels}  # Slight offset
+    nx.draw_networkx_labels(G, label_pos, labels=labels, font_size=10, font_color="black", ax=ax)
+
+    # Draw edge labels (distances) เฉพาะบนเส้นทาง หรือทุกถนนเมื่อแผนที่เล็ก
+    if detailed:
+        edge_labels = {(nodes[u], nodes[v]): G.edges[nodes[u], nodes[v]]["weight"] for u, v in visible_edges}
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=10, ax=ax)
+    else:
+        edge_labels = {(u, v): G[u][v]["weight"] for u, v in path_edges[:label_limit]}
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=7, bbox={"alpha": 0}, ax=ax)
 
     # Title and path description
     plt.suptitle("Shortest Path Finder for Cafés", fontsize=18, fontweight="bold", color="darkblue", y=1.00)
 
     # Format the start and end text with full cafe names and wrap the text
     start_end_text = f"Start: {dic_cafe.get(path[0], path[0])} to {dic_cafe.get(path[-1], path[-1])}"
-    path_text = f"Path: {' → '.join([dic_cafe.get(cafe, cafe) for cafe in path])} (Total: {total_distance} km)"
+    path_names = [dic_cafe.get(cafe, cafe) for cafe in path]
+    if not detailed and len(path_names) > 12:
+        path_names = path_names[:5] + ["…"] + path_names[-5:]
+    path_text = f"Path: {' → '.join(path_names)} (Total: {total_distance} km)"
     
     # Wrap the text if it's too long
     start_end_text_wrapped = wrap_text(start_end_text, max_length=70)
@@ -134,25 +139,56 @@ def draw_shortest_path(path, total_distance):
 
     # Show plot with margin adjustments
     plt.subplots_adjust(top=0.25)
-    plt.margins(0.3)
+    if not crop:
+        ax.autoscale_view()
+        plt.margins(0.3)
+    plt.show()
+
+
+#ฟังก์ชันแสดงคาเฟ่ที่ไปถึงได้ (ใช้ผลจาก find_reachable_cafes ไม่ต้องคำนวณใหม่)
+def draw_reachable_cafes(reach):
+    import matplotlib.pyplot as plt
+
+    start = reach.origin
+    reachable = dict(reach.cafes(dic_cafe))
+    tree_edges = {frozenset(edge) for edge in reach.edges()}
+
+    plt.figure(figsize=(8, 8))
+    pos = positions
+
+    node_colors = ["pink" if node == start else "lightgreen" if node in reachable else "lightgray" for node in G.nodes()]
+    edge_colors = ["lightgreen" if frozenset((u, v)) in tree_edges else "lightgray" for u, v in G.edges()]
+
+    nx.draw(G, pos, with_labels=False, node_size=1500, node_color=node_colors, edge_color=edge_colors, width=2)
+
+    labels = nx.get_node_attributes(G, "name")
+    nx.draw_networkx_labels(G, pos, labels=labels, font_size=10, font_color="black")
+
+    edge_labels = {(u, v): G[u][v]["weight"] for u, v in G.edges()}
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=10)
+
+    plt.suptitle(f"Cafés within {reach.radius} km", fontsize=18, fontweight="bold", color="darkblue", y=1.00)
+    plt.figtext(0.5, 0.1, f"Start: {dic_cafe.get(start, start)}", fontsize=12, color="gray", ha="center")
+    reachable_text = ", ".join(f"{dic_cafe.get(cafe, cafe)} ({d} km)" for cafe, d in reachable.items())
+    plt.figtext(0.5, 0.03, wrap_text(f"Reachable: {reachable_text or '-'}", max_length=80), fontsize=12, color="gray", ha="center")
+    plt.subplots_adjust(top=0.25)
+    plt.margins(0.2)
     plt.show()
 
 
 #ฟังก์ชันแสดงคาเฟ่ใกล้เคียง
 def draw_nearby_cafes(start, max_results=3):
+    import matplotlib.pyplot as plt
+
     if start not in G:
         print(f"ไม่พบ {start} ในกราฟ")
         return
 
-    nearby = sorted(G[start].items(), key=lambda x: x[1]["weight"])[:max_results]
+    nearby = find_nearby_cafes(start, max_results)
     nearby_edges = [(start, cafe) for cafe, _ in nearby]
 
     plt.figure(figsize=(8, 8))
-    pos = nx.spring_layout(G, seed=42)
-    pos = {
-        "A":(2,6), "B":(1,3), "C":(-0.2,8), "D":(1,0),
-        "E":(7,1.2), "F":(4,4), "G":(3,-4), "H":(5,-5), "I":(3,2)
-    }
+    pos = positions
 
     node_colors = ["pink" if node == start else "lightgreen" if node in [cafe for cafe, _ in nearby] else "lightgray" for node in G.nodes()]
     edge_colors = ["lightgray" if (start, cafe) in nearby_edges or (cafe, start) in nearby_edges else "lightgray" for (u, v) in G.edges()]
@@ -173,48 +209,197 @@ def draw_nearby_cafes(start, max_results=3):
     plt.margins(0.2)
     plt.show()
 
-# 🔹 เมนูหลัก
-while True:
-    try:
-        print("\n--- Café Route Finder ---")
-        print("1. Set Start & Destination")
-        print("2. Nearby Destinations")
-        print("0. Exit")
-        menu = int(input("Select menu: "))
-
-        if menu == 1:
-            print(f"{'-'*30}\n{'Cafe':10} | {'Name ':15} \n{'-'*30}")
-            for cafe, name in dic_cafe.items():
-                print(f"{cafe:10} | {name:20}\n{'-'*30}")
-
-            start = input("Enter Start Café: ").strip().upper()
-            destinations = [d.strip().upper() for d in input("Enter Destinations (comma separated ex: A,B): ").split(",")]
-
-            if start not in G or any(dest not in G for dest in destinations):
-                print("Invalid Café name(s). Try again.")
-                continue
-
-            path, distance = find_best_shortest_path(start, destinations)
-            print(f"Best Path: {' → '.join(path)} (Total: {distance} km)")
-            draw_shortest_path(path, distance)
-
-        elif menu == 2:
-            print(f"{'-'*30}\n{'Cafe':10} | {'Name ':15} \n{'-'*30}")
-            for cafe, name in dic_cafe.items():
-                print(f"{cafe:10} | {name:20}\n{'-'*30}")
-            start = input("Enter Café to find nearby locations: ").strip().upper()
-            if start not in G:
-                print("Invalid Café name.")
-                continue
-            draw_nearby_cafes(start)
-
-        elif menu == 0:
-            print("Exit Program.")
-            input("Press Enter to Exit... ")
-            break
+# 🔹 วาดภาพแบบไม่มีหน้าต่าง (Agg) สำหรับทำภาพเส้นทางจำนวนมาก
+# แผนที่พื้นฐานสร้างครั้งเดียวต่อ revision ของกราฟ แต่ละภาพวาดทับแค่เส้นทาง/สี
+_map_renderer = None
+
+def map_renderer():
+    from map_renderer import MapRenderer
+
+    global _map_renderer
+    key = graph_revision()
+    if _map_renderer is None or _map_renderer[0] != key:
+        _map_renderer = (key, MapRenderer(G, positions, labels=nx.get_node_attributes(G, "name"), label_limit=LABEL_EDGE_LIMIT))
+    return _map_renderer[1]
+
+
+# สี/ข้อความที่วาดทับแผนที่พื้นฐาน ใช้ร่วมกันทั้งภาพแบบไม่มีหน้าต่างและหน้าต่างแผนที่
+def route_overlay(path, total_distance, destinations=None):
+    destination_set = set(destinations or path[-1:])
+    node_colors = {node: "lightgreen" for node in path}
+    node_colors.update((node, "skyblue") for node in destination_set)
+    node_colors[path[0]] = "pink"
+    edge_colors = {(u, v): "lightgreen" for u, v in zip(path, path[1:])}
+
+    captions = [
+        wrap_text(f"Start: {dic_cafe.get(path[0], path[0])} to {dic_cafe.get(path[-1], path[-1])}", max_length=70),
+        wrap_text(f"Path: {' → '.join([dic_cafe.get(cafe, cafe) for cafe in path])} (Total: {total_distance} km)", max_length=80),
+    ]
+    return node_colors, edge_colors, "Shortest Path Finder for Cafés", captions
+
+
+def nearby_overlay(start, found):
+    node_colors = {cafe: "lightgreen" for cafe, _ in found}
+    node_colors[start] = "pink"
+
+    captions = [
+        f"Start: {dic_cafe.get(start, start)}",
+        f"Nearby: {', '.join([dic_cafe.get(cafe, cafe) for cafe, _ in found])}",
+    ]
+    return node_colors, None, "Nearby Cafés Finder", captions
+
+
+def reachable_overlay(reach):
+    reachable = dict(reach.cafes(dic_cafe))
+    node_colors = {cafe: "lightgreen" for cafe in reachable}
+    node_colors[reach.origin] = "pink"
+    edge_colors = {edge: "lightgreen" for edge in reach.edges()}
+
+    reachable_text = ", ".join(f"{dic_cafe.get(cafe, cafe)} ({d} km)" for cafe, d in reachable.items())
+    captions = [
+        f"Start: {dic_cafe.get(reach.origin, reach.origin)}",
+        wrap_text(f"Reachable: {reachable_text or '-'}", max_length=80),
+    ]
+    return node_colors, edge_colors, f"Cafés within {reach.radius} km", captions
 
-        else:
-            print("Invalid selection. Please try again.")
 
-    except Exception as e:
-        print(f"Error: {e}. Try again.")
+# out: path ไฟล์ (.png/.svg), ออบเจ็กต์ไฟล์ หรือ None เพื่อรับเป็น bytes
+def render_route_image(path, total_distance, destinations=None, out=None, format=None):
+    return map_renderer().overlay(*route_overlay(path, total_distance, destinations)).save(out, format)
+
+
+def render_nearby_image(start, max_results=3, out=None, format=None):
+    return map_renderer().overlay(*nearby_overlay(start, find_nearby_cafes(start, max_results))).save(out, format)
+
+
+# 🔹 หน้าต่างแผนที่ที่เปิดค้างไว้: สร้างแผนที่ครั้งเดียว คำขอถัดไปเปลี่ยนแค่สี/ข้อความ
+# ปิดหน้าต่างหรือกราฟเปลี่ยนจะสร้างใหม่ในครั้งถัดไป (ใช้ figure เดียวเสมอ)
+_map_window = None
+
+def map_window():
+    import matplotlib.pyplot as plt
+    from map_renderer import MapRenderer
+
+    global _map_window
+    key = graph_revision()
+    if _map_window is not None and (_map_window[0] != key or not plt.fignum_exists(_map_window[1].figure.number)):
+        plt.close(_map_window[1].figure)
+        _map_window = None
+    if _map_window is None:
+        figure = plt.figure("Café Route Finder", figsize=(8, 8))
+        _map_window = (key, MapRenderer(G, positions, labels=nx.get_node_attributes(G, "name"), figure=figure, label_limit=LABEL_EDGE_LIMIT))
+        plt.show(block=False)
+    return _map_window[1]
+
+
+def show_route(path, total_distance, destinations=None):
+    map_window().overlay(*route_overlay(path, total_distance, destinations)).refresh()
+
+
+def show_nearby_cafes(start, max_results=3):
+    map_window().overlay(*nearby_overlay(start, find_nearby_cafes(start, max_results))).refresh()
+
+
+def show_reachable_cafes(reach):
+    map_window().overlay(*reachable_overlay(reach)).refresh()
+
+
+# 🔹 เมนูหลัก
+if __name__ == "__main__":
+    if os.environ.get("CAFE_NODES") and os.environ.get("CAFE_EDGES"):
+        load_cafes(os.environ["CAFE_NODES"], os.environ["CAFE_EDGES"], os.environ.get("CAFE_SNAPSHOT"))
+        network_graph()  # เมนูวาดแผนที่จาก G
+    if os.environ.get("CAFE_ROUTE_CACHE"):
+        open_route_store(os.environ["CAFE_ROUTE_CACHE"])
+
+    while True:
+        try:
+            print("\n--- Café Route Finder ---")
+            print("1. Set Start & Destination")
+            print("2. Nearby Destinations")
+            print("3. Cafés Within Distance")
+            print("4. Split Trip Between Couriers")
+            print("0. Exit")
+            menu = int(input("Select menu: "))
+
+            if menu == 1:
+                print(f"{'-'*30}\n{'Cafe':10} | {'Name ':15} \n{'-'*30}")
+                for cafe, name in dic_cafe.items():
+                    print(f"{cafe:10} | {name:20}\n{'-'*30}")
+
+                start = input("Enter Start Café: ").strip().upper()
+                destinations = [d.strip().upper() for d in input("Enter Destinations (comma separated ex: A,B): ").split(",")]
+
+                if start not in G or any(dest not in G for dest in destinations):
+                    print("Invalid Café name(s). Try again.")
+                    continue
+
+                session = RouteSession(start, destinations)
+                while True:
+                    path, distance = session.route()
+                    destinations = session.destinations
+                    print(f"Best Path: {' → '.join(path)} (Total: {distance} km)")
+                    show_route(path, distance, destinations)
+
+                    # ปรับทริป: +X เพิ่มคาเฟ่, -X ลบคาเฟ่, ! คำนวณใหม่ทั้งหมด, Enter จบ
+                    change = input("Edit trip (+X add, -X remove, ! re-solve, Enter to finish): ").strip().upper()
+                    if not change:
+                        break
+                    if change == "!":
+                        session.resolve()
+                    elif change[0] == "+" and change[1:] in G:
+                        session.add_stop(change[1:])
+                    elif change[0] == "-" and change[1:] in session.destinations and len(session.destinations) > 1:
+                        session.remove_stop(change[1:])
+                    else:
+                        print("Invalid change.")
+
+            elif menu == 2:
+                print(f"{'-'*30}\n{'Cafe':10} | {'Name ':15} \n{'-'*30}")
+                for cafe, name in dic_cafe.items():
+                    print(f"{cafe:10} | {name:20}\n{'-'*30}")
+                start = input("Enter Café to find nearby locations: ").strip().upper()
+                if start not in G:
+                    print("Invalid Café name.")
+                    continue
+                show_nearby_cafes(start)
+
+            elif menu == 3:
+                print(f"{'-'*30}\n{'Cafe':10} | {'Name ':15} \n{'-'*30}")
+                for cafe, name in dic_cafe.items():
+                    print(f"{cafe:10} | {name:20}\n{'-'*30}")
+                start = input("Enter Start Café: ").strip().upper()
+                if start not in G:
+                    print("Invalid Café name.")
+                    continue
+                radius = float(input("Enter distance (km): "))
+
+                reach = find_reachable_cafes([start], radius)[start]
+                for cafe, d in reach.cafes(dic_cafe):
+                    print(f"{cafe:10} | {dic_cafe[cafe]:30} | {d} km")
+                show_reachable_cafes(reach)
+
+            elif menu == 4:
+                print(f"{'-'*30}\n{'Cafe':10} | {'Name ':15} \n{'-'*30}")
+                for cafe, name in dic_cafe.items():
+                    print(f"{cafe:10} | {name:20}\n{'-'*30}")
+                start = input("Enter Start Café: ").strip().upper()
+                destinations = [d.strip().upper() for d in input("Enter Destinations (comma separated ex: A,B): ").split(",")]
+                if start not in G or any(dest not in G for dest in destinations):
+                    print("Invalid Café name(s). Try again.")
+                    continue
+                couriers = int(input("Number of couriers: "))
+
+                for rider, (path, distance) in enumerate(find_courier_routes(start, destinations, couriers), 1):
+                    print(f"Courier {rider}: {' → '.join(path)} (Total: {distance} km)")
+
+            elif menu == 0:
+                print("Exit Program.")
+                input("Press Enter to Exit... ")
+                break
+
+            else:
+                print("Invalid selection. Please try again.")
+
+        except Exception as e:
+            print(f"Error: {e}. Try again.")
@@ -0,0 +1,115 @@
+"""
+แคชระยะทางและเส้นทางแบบถาวร (SQLite) ใช้ร่วมกันระหว่างการรันแต่ละครั้งและระหว่าง process
+"""
+import hashlib
+import json
+import sqlite3
+
+
+# key ของข้อมูลทั้งหมดคือ hash ของโหนดและเส้นทางในกราฟ ถ้ากราฟเปลี่ยนข้อมูลเก่าจะไม่ถูกใช้อีก
+def graph_hash(graph):
+    h = hashlib.sha256()
+    for node in sorted(repr(node) for node in graph.nodes):
+        h.update(node.encode())
+        h.update(b"\0")
+    h.update(b"\1")
+    for u, v, weight in sorted(
+        (*sorted((repr(u), repr(v))), repr(weight)) for u, v, weight in graph.edges(data="weight")
+    ):
+        h.update(f"{u}\0{v}\0{weight}\0".encode())
+    return h.hexdigest()
+
+
+class RouteStore:
+    def __init__(self, path, graph):
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS legs ("
+                "graph TEXT, source TEXT, dist TEXT, pred TEXT, PRIMARY KEY (graph, source))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS routes ("
+                "graph TEXT, query TEXT, path TEXT, distance REAL, PRIMARY KEY (graph, query))"
+            )
+        self.bind(graph)
+
+    # ผูกกับกราฟปัจจุบัน และลบข้อมูลของกราฟเวอร์ชันอื่นทิ้ง
+    def bind(self, graph):
+        self.graph_hash = graph_hash(graph)
+        with self.conn:
+            self.conn.execute("DELETE FROM legs WHERE graph != ?", (self.graph_hash,))
+            self.conn.execute("DELETE FROM routes WHERE graph != ?", (self.graph_hash,))
+
+    # กราฟถูกแก้ไขบางเส้น: ย้ายข้อมูลที่ยังถูกต้องไปยังกราฟใหม่ ลบเฉพาะ source/คำขอที่ระบุ
+    def rebind(self, graph, stale_sources=(), stale_queries=()):
+        old, new = self.graph_hash, graph_hash(graph)
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM legs WHERE graph = ? AND source = ?", [(old, json.dumps(source)) for source in stale_sources]
+            )
+            self.conn.executemany("DELETE FROM routes WHERE graph = ? AND query = ?", [(old, query) for query in stale_queries])
+            self.conn.execute("UPDATE legs SET graph = ? WHERE graph = ?", (new, old))
+            self.conn.execute("UPDATE routes SET graph = ? WHERE graph = ?", (new, old))
+        self.graph_hash = new
+
+    # อ่านทุกแถวของกราฟปัจจุบัน: yield (source, pred, dist)
+    def iter_legs(self):
+        for source, dist, pred in self.conn.execute("SELECT source, dist, pred FROM legs WHERE graph = ?", (self.graph_hash,)):
+            yield json.loads(source), {node: preds for node, preds in json.loads(pred)}, {node: distance for node, distance in json.loads(dist)}
+
+    # yield (query, start, destinations, path) โดย query คือ key ที่ใช้ลบใน rebind
+    def iter_routes(self):
+        for query, path in self.conn.execute("SELECT query, path FROM routes WHERE graph = ?", (self.graph_hash,)):
+            start, destinations = json.loads(query)[:2]
+            yield query, start, destinations, json.loads(path)
+
+    # ผลของ Dijkstra จากแต่ละ source: {source: (pred, dist)}
+    def get_legs(self, sources):
+        keys = {json.dumps(source): source for source in sources}
+        rows = {}
+        placeholders = ",".join("?" * len(keys))
+        for source, dist, pred in self.conn.execute(
+            f"SELECT source, dist, pred FROM legs WHERE graph = ? AND source IN ({placeholders})",
+            (self.graph_hash, *keys),
+        ):
+            # JSON keys are always strings, so nodes are kept as [node, value] pairs
+            rows[keys[source]] = (
+                {node: preds for node, preds in json.loads(pred)},
+                {node: distance for node, distance in json.loads(dist)},
+            )
+        return rows
+
+    def put_legs(self, legs):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO legs VALUES (?, ?, ?, ?)",
+                [
+                    (self.graph_hash, json.dumps(source), json.dumps(list(dist.items())), json.dumps(list(pred.items())))
+                    for source, (pred, dist) in legs.items()
+                ],
+            )
+
+    # options: ตัวเลือกของ solver เป็นคู่ (ชื่อ, ค่า) เรียงตามชื่อ (ดู cafe_routes.route_key)
+    def _query(self, start, destinations, method, options=()):
+        return json.dumps([start, sorted(set(destinations), key=repr), method, sorted(options)])
+
+    def get_route(self, start, destinations, method="auto", options=()):
+        row = self.conn.execute(
+            "SELECT path, distance FROM routes WHERE graph = ? AND query = ?",
+            (self.graph_hash, self._query(start, destinations, method, options)),
+        ).fetchone()
+        if row is None:
+            return None
+        distance = row[1]
+        return json.loads(row[0]), int(distance) if distance.is_integer() else distance
+
+    def put_route(self, start, destinations, method, path, distance, options=()):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?)",
+                (self.graph_hash, self._query(start, destinations, method, options), json.dumps(path), distance),
+            )
+
+    def close(self):
+        self.conn.close()
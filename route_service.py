@@ -0,0 +1,235 @@
+"""
+บริการ HTTP ในเครื่อง (asyncio, ไม่ใช้ไลบรารีภายนอก) สำหรับหาเส้นทางคาเฟ่และคาเฟ่ใกล้เคียง
+
+    python route_service.py --port 8080 --workers 4 --timeout 5
+    GET  /route?start=A&destinations=E,H[&method=auto]
+    POST /route        {"start": "A", "destinations": ["E", "H"], "method": "auto"}
+    GET  /nearby?start=A[&k=3][&radius=10]
+    GET  /stats
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import networkx as nx
+import cafe_routes
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 422: "Unprocessable Entity", 500: "Internal Server Error", 504: "Gateway Timeout"}
+MAX_BODY = 1 << 20
+# จำนวนจุดหมายสูงสุดของวิธีที่ลองทุกลำดับ (เกินนี้ใช้เวลานานจน worker ค้าง) ใช้ method=auto แทน
+EXACT_STOP_LIMITS = {
+    "brute-force": cafe_routes.BRUTE_FORCE_LIMIT,
+    "held-karp": cafe_routes.HELD_KARP_LIMIT,
+    "branch-and-bound": cafe_routes.BRANCH_AND_BOUND_LIMIT,
+}
+# parallel สร้าง pool เท่าจำนวน core ซ้อนใน worker ทุกคำขอ บริการแบ่งงานตามคำขออยู่แล้วจึงไม่รับ
+SERVICE_EXCLUDED_METHODS = {"parallel": "branch-and-bound"}
+
+
+# 🔹 งานที่รันใน process ของ worker (กราฟ/แคชอยู่ในหน่วยความจำของ worker ตลอดอายุ pool)
+def _init_worker(nodes, edges, snapshot, store, hierarchy, csr):
+    if nodes and edges:
+        cafe_routes.load_cafes(nodes, edges, snapshot)
+    if store:
+        cafe_routes.open_route_store(store)
+    if hierarchy:
+        cafe_routes.use_contraction_hierarchy(hierarchy)
+    if csr:
+        cafe_routes.use_csr_backend()
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _solve_route(start, destinations, method):
+    path, distance = cafe_routes.find_best_shortest_path(start, destinations, method=method)
+    return list(path), distance.item() if hasattr(distance, "item") else distance
+
+
+def _find_nearby(start, k, radius):
+    return [[cafe, distance] for cafe, distance in cafe_routes.find_nearby_cafes(start, k, radius)]
+
+
+class RouteService:
+    def __init__(self, workers=None, timeout=5.0, nodes=None, edges=None, store=None, hierarchy=None, csr=False, snapshot=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.config = (nodes, edges, snapshot, store, hierarchy, csr)
+        self.pool = None
+        self.in_flight = {}
+        self.results = cafe_routes.RouteCache(maxsize=4096)
+        self.counters = {"requests": 0, "computed": 0, "coalesced": 0, "cached": 0, "timeouts": 0}
+
+    # สร้าง pool และรอให้ worker ทุกตัวโหลดกราฟเสร็จก่อนรับคำขอ
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=self.config)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # คำขอที่เหมือนกันและยังคำนวณอยู่ใช้งานเดียวกัน ถ้าหมดเวลาจะไม่ยกเลิกงานที่คนอื่นรออยู่
+    async def _coalesced(self, key, function, *args):
+        cached = self.results.get(key)
+        if cached is not None:
+            self.counters["cached"] += 1
+            return cached
+
+        future = self.in_flight.get(key)
+        if future is None:
+            self.counters["computed"] += 1
+            future = asyncio.get_running_loop().run_in_executor(self.pool, function, *args)
+            self.in_flight[key] = future
+
+            def done(future):
+                self.in_flight.pop(key, None)
+                if not future.cancelled() and future.exception() is None:
+                    self.results.put(key, future.result())
+
+            future.add_done_callback(done)
+        else:
+            self.counters["coalesced"] += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise
+
+    async def route(self, start, destinations, method="auto"):
+        path, distance = await self._coalesced(("route", *cafe_routes.route_key(start, destinations, method), cafe_routes.graph_revision()), _solve_route, start, list(destinations), method)
+        return {"start": start, "destinations": list(destinations), "path": path, "distance": distance}
+
+    async def nearby(self, start, k=3, radius=None):
+        found = await self._coalesced(("nearby", start, k, radius, cafe_routes.graph_revision()), _find_nearby, start, k, radius)
+        return {"start": start, "nearby": found}
+
+    def stats(self):
+        return {**self.counters, "in_flight": len(self.in_flight), "cache": self.results.stats(), "workers": self.workers}
+
+    # 🔹 แปลงคำขอ HTTP เป็นการเรียก route/nearby คืน (status, ข้อมูล JSON)
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError as e:
+                return 400, {"error": f"invalid JSON: {e}"}
+            if not isinstance(payload, dict):
+                return 400, {"error": "JSON body must be an object"}
+            query.update(payload)
+        elif method != "GET":
+            return 405, {"error": f"method {method} not allowed"}
+
+        try:
+            if url.path == "/route":
+                destinations = query.get("destinations", [])
+                if isinstance(destinations, str):
+                    destinations = [d.strip() for d in destinations.split(",") if d.strip()]
+                if "start" not in query or not destinations:
+                    return 400, {"error": "start and destinations are required"}
+                method = query.get("method", "auto")
+                if method in SERVICE_EXCLUDED_METHODS:
+                    return 400, {"error": f"{method} is not available in the service, use method={SERVICE_EXCLUDED_METHODS[method]}"}
+                stops = len(set(destinations) - {query["start"]})
+                if stops > EXACT_STOP_LIMITS.get(method, stops):
+                    return 400, {"error": f"{method} allows at most {EXACT_STOP_LIMITS[method]} destinations, use method=auto"}
+                return 200, await self.route(query["start"], destinations, method)
+            if url.path == "/nearby":
+                if "start" not in query:
+                    return 400, {"error": "start is required"}
+                radius = query.get("radius")
+                return 200, await self.nearby(query["start"], int(query.get("k", 3)), float(radius) if radius is not None else None)
+            if url.path == "/stats":
+                return 200, self.stats()
+            return 404, {"error": f"unknown path {url.path}"}
+        except asyncio.TimeoutError:
+            return 504, {"error": f"timed out after {self.timeout} s"}
+        except (nx.NodeNotFound, KeyError) as e:
+            return 404, {"error": str(e)}
+        except nx.NetworkXNoPath as e:
+            return 422, {"error": str(e)}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) != 3:
+                status, payload = 400, {"error": "malformed request line"}
+            elif int(headers.get("content-length", 0)) > MAX_BODY:
+                status, payload = 400, {"error": "request body too large"}
+            else:
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.counters["requests"] += 1
+                status, payload = await self.dispatch(request_line[0].upper(), request_line[1], body)
+
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        await self.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Café route service on http://{host}:{port} ({self.workers} workers)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve café routes over HTTP on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds per request")
+    parser.add_argument("--nodes", default=os.environ.get("CAFE_NODES"))
+    parser.add_argument("--edges", default=os.environ.get("CAFE_EDGES"))
+    parser.add_argument("--snapshot", default=os.environ.get("CAFE_SNAPSHOT"), help="binary graph snapshot (read if fresh, else written)")
+    parser.add_argument("--cache", default=os.environ.get("CAFE_ROUTE_CACHE"), help="SQLite route cache")
+    parser.add_argument("--hierarchy", help="contraction hierarchy file (.npz)")
+    parser.add_argument("--csr", action="store_true", help="use the CSR routing backend")
+    args = parser.parse_args(argv)
+
+    # กราฟใน process หลักใช้ทำ key ของแคช (revision ของกราฟ) และตรวจชื่อคาเฟ่
+    # โหลดก่อนเริ่ม worker จึงเขียน snapshot เสร็จก่อนที่ worker จะเปิดใช้
+    if args.nodes and args.edges:
+        cafe_routes.load_cafes(args.nodes, args.edges, args.snapshot)
+
+    service = RouteService(args.workers, args.timeout, args.nodes, args.edges, args.cache, args.hierarchy, args.csr, args.snapshot)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,134 @@
 import networkx as nx
-import matplotlib.pyplot as plt
-import tkinter as tk
-from tkinter import ttk
-from itertools import permutations
-
-# สร้างกราฟ
-G = nx.Graph()
-dic_cafe = {
-    "A": "Myrrh Cafe Prachinburi",
-    "B": "Toast bar Cafe",
-    "C": "Noen Hom Cafe",
-    "D": "Rong See Coffee Prachinburi",
-    "E": "Homurumu Cafe",
-    "F": "Eto slowbar",
-    "G": "Nare Cafe",
-    "H": "VV Cafe & bistro",
-    "I": "Baan Fuangfah cafe"
-}
-G.add_nodes_from(dic_cafe.keys())
-
-edges = [
-    ("A", "B", 12), ("A", "C", 10), ("B", "C", 13), ("B", "D", 7),
-    ("D", "G", 12), ("E", "F", 9), ("G", "H", 2), ("G", "I", 5),
-    ("I", "E", 11), ("I", "F", 3), ("H", "I", 9)
-]
-G.add_weighted_edges_from(edges)
-
-# ฟังก์ชันคำนวณเส้นทาง
-
-def find_best_shortest_path(start, destinations):
-    best_path, best_distance = None, float("inf")
-    for perm in permutations(destinations):
-        path = [start]
-        total_distance = 0
-        current = start
-        for stop in perm:
-            sub_path = nx.shortest_path(G, source=current, target=stop, weight="weight")
-            total_distance += nx.shortest_path_length(G, source=current, target=stop, weight="weight")
-            path.extend(sub_path[1:])
-            current = stop
-        if total_distance < best_distance:
-            best_distance, best_path = total_distance, path
-    return best_path, best_distance
-
-# ฟังก์ชันวาดเส้นทาง
-
-def draw_shortest_path(path, total_distance):
-    pos = nx.spring_layout(G, seed=42)
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cafe_routes
+from cafe_routes import Cancelled, G, dic_cafe
+
+pos = nx.spring_layout(G, seed=42)
+
+# ฟังก์ชันคำนวณเส้นทาง: ตารางระยะทางและตัวแก้ลองทุกลำดับจาก cafe_routes
+# progress["explored"] นับจำนวนลำดับที่ตรวจแล้ว, cancel (threading.Event) ใช้หยุดกลางทาง
+
+def find_best_shortest_path(start, destinations, progress=None, cancel=None):
+    matrix = cafe_routes.DistanceMatrix(cafe_routes.routing_graph(), [start, *destinations])
+    first, stops = cafe_routes.route_stops(matrix, start, destinations)
+    order, distance = cafe_routes.solve_brute_force(matrix.dist, first, stops, progress=progress, cancel=cancel)
+    # สร้างเส้นทางจริงเฉพาะลำดับที่ดีที่สุด
+    return matrix.build_path([first, *order]), distance
+
+# ฟังก์ชันวาดเส้นทาง (วาดลงแกนของ canvas ที่ฝังในหน้าต่าง)
+
+def draw_shortest_path(path, total_distance, ax):
+    path_edges = {frozenset(edge) for edge in zip(path, path[1:])}
     node_colors = ["pink" if node == path[0] or node == path[-1] else "lightgreen" if node in path else "lightgray" for node in G.nodes()]
-    edge_colors = ["lightgreen" if (u, v) in zip(path, path[1:]) else "lightgray" for u, v in G.edges()]
-    plt.figure(figsize=(8, 8))
-    nx.draw(G, pos, with_labels=True, node_size=1500, node_color=node_colors, edge_color=edge_colors, width=2)
-    plt.title(f"Best Path (Total: {total_distance} km)")
-    plt.show()
+    edge_colors = ["lightgreen" if frozenset((u, v)) in path_edges else "lightgray" for u, v in G.edges()]
+    ax.clear()
+    nx.draw(G, pos, ax=ax, with_labels=True, node_size=1500, node_color=node_colors, edge_color=edge_colors, width=2)
+    ax.set_title(f"Best Path (Total: {total_distance} km)")
+    canvas.draw_idle()
 
 # GUI
+# การคำนวณทำใน thread แยก หน้าต่างตรวจผล/ความคืบหน้าด้วย root.after จึงไม่ค้าง
+
+executor = ThreadPoolExecutor(max_workers=1)
+job = None
 
 def find_route():
+    global job
     start = start_var.get()
-    destinations = [dest_var.get()]
-    if not start or not destinations[0]:
+    destinations = [dest_list.get(i) for i in dest_list.curselection() if dest_list.get(i) != start]
+    if not start or not destinations:
         result_label.config(text="กรุณาเลือกจุดเริ่มต้นและจุดหมาย")
         return
-    path, distance = find_best_shortest_path(start, destinations)
+
+    progress, cancel = {"explored": 0}, threading.Event()
+    job = {
+        "future": executor.submit(find_best_shortest_path, start, destinations, progress, cancel),
+        "progress": progress,
+        "cancel": cancel,
+        "total": math.factorial(len(destinations)),
+    }
+    find_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+    root.after(50, poll_route, job)
+
+def poll_route(current):
+    future = current["future"]
+    if not future.done():
+        progress_label.config(text=f"ตรวจแล้ว {current['progress']['explored']:,} / {current['total']:,} เส้นทาง")
+        root.after(50, poll_route, current)
+        return
+
+    find_button.config(state=tk.NORMAL)
+    cancel_button.config(state=tk.DISABLED)
+    try:
+        path, distance = future.result()
+    except Cancelled:
+        result_label.config(text="ยกเลิกการค้นหาแล้ว")
+        return
+    except (nx.NetworkXNoPath, KeyError):
+        result_label.config(text="ไม่พบเส้นทาง")
+        return
+    progress_label.config(text=f"ตรวจแล้ว {current['progress']['explored']:,} / {current['total']:,} เส้นทาง")
     result_label.config(text=f"เส้นทาง: {' → '.join(path)} (รวม {distance} km)")
-    draw_shortest_path(path, distance)
+    draw_shortest_path(path, distance, ax)
+
+def cancel_route():
+    if job is not None:
+        job["cancel"].set()
+
+def close():
+    cancel_route()
+    executor.shutdown(wait=False)
+    root.destroy()
+
+# Tk และ matplotlib โหลดเฉพาะเมื่อเปิดหน้าต่าง (import ไฟล์นี้เพื่อใช้ find_best_shortest_path ได้โดยไม่โหลด)
+if __name__ == "__main__":
+    import tkinter as tk
+    from tkinter import ttk
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+
+    root = tk.Tk()
+    root.title("Café Route Finder")
+    root.geometry("700x900")
+    root.protocol("WM_DELETE_WINDOW", close)
 
-root = tk.Tk()
-root.title("Café Route Finder")
-root.geometry("400x300")
+    start_var = tk.StringVar()
 
-start_var = tk.StringVar()
-dest_var = tk.StringVar()
+    # เลือกจุดเริ่มต้น
+    start_label = tk.Label(root, text="เลือกจุดเริ่มต้น:")
+    start_label.pack()
+    start_menu = ttk.Combobox(root, textvariable=start_var, values=list(dic_cafe.keys()))
+    start_menu.pack()
 
-# เลือกจุดเริ่มต้น
-start_label = tk.Label(root, text="เลือกจุดเริ่มต้น:")
-start_label.pack()
-start_menu = ttk.Combobox(root, textvariable=start_var, values=list(dic_cafe.keys()))
-start_menu.pack()
+    # เลือกจุดหมาย (เลือกได้หลายจุด)
+    dest_label = tk.Label(root, text="เลือกจุดหมาย (เลือกได้หลายจุด):")
+    dest_label.pack()
+    dest_list = tk.Listbox(root, selectmode=tk.MULTIPLE, exportselection=False, height=len(dic_cafe))
+    for cafe in dic_cafe:
+        dest_list.insert(tk.END, cafe)
+    dest_list.pack()
 
-# เลือกจุดหมาย
-dest_label = tk.Label(root, text="เลือกจุดหมาย:")
-dest_label.pack()
-dest_menu = ttk.Combobox(root, textvariable=dest_var, values=list(dic_cafe.keys()))
-dest_menu.pack()
+    # ปุ่มค้นหา / ยกเลิก
+    find_button = tk.Button(root, text="ค้นหาเส้นทาง", command=find_route)
+    find_button.pack()
+    cancel_button = tk.Button(root, text="ยกเลิก", command=cancel_route, state=tk.DISABLED)
+    cancel_button.pack()
 
-# ปุ่มค้นหา
-find_button = tk.Button(root, text="ค้นหาเส้นทาง", command=find_route)
-find_button.pack()
+    # แสดงผลลัพธ์
+    progress_label = tk.Label(root, text="")
+    progress_label.pack()
+    result_label = tk.Label(root, text="")
+    result_label.pack()
 
-# แสดงผลลัพธ์
-result_label = tk.Label(root, text="")
-result_label.pack()
+    # แผนที่ในหน้าต่าง
+    figure = Figure(figsize=(7, 6))
+    ax = figure.add_subplot()
+    ax.set_axis_off()
+    canvas = FigureCanvasTkAgg(figure, master=root)
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
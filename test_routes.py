@@ -0,0 +1,375 @@
+"""
+เทียบผลของตัวหาเส้นทาง (ทุก solver / backend, contraction hierarchy, การแก้ไขเส้นทาง) กับ Dijkstra ของ networkx
+บนกราฟสุ่ม
+
+    python -m pytest -q test_routes.py
+"""
+import asyncio
+import json
+import random
+import threading
+from itertools import permutations
+
+import networkx as nx
+import pytest
+
+import batch_routes
+import cafe_routes
+import graph_loader
+from bench_routes import make_graph, use_graph
+from contraction import ContractionHierarchy
+from route_service import RouteService
+
+
+# ระยะทางสั้นสุดที่แวะครบทุกจุดหมาย (ลองทุกลำดับบนระยะทางจาก networkx) หรือ None ถ้าไปไม่ถึง
+def best_tour(graph, start, destinations):
+    lengths = {node: nx.single_source_dijkstra_path_length(graph, node) for node in {start, *destinations}}
+    stops = [dest for dest in dict.fromkeys(destinations) if dest != start]
+    if any(stop not in lengths[start] for stop in stops):
+        return None
+    return min(sum(lengths[a][b] for a, b in zip((start, *order), order)) for order in permutations(stops))
+
+
+def assert_valid_path(graph, path, distance, start, destinations):
+    assert path[0] == start
+    assert set(destinations) <= set(path)
+    assert all(graph.has_edge(a, b) for a, b in zip(path, path[1:]))
+    assert nx.path_weight(graph, path, weight="weight") == pytest.approx(distance)
+
+
+def sample_query(graph, rng, stops):
+    cafes = sorted(node for node, name in graph.nodes(data="name") if name)
+    return rng.choice(sorted(graph.nodes)), rng.sample(cafes, stops)
+
+
+# กราฟสุ่มแทนข้อมูลคาเฟ่ระหว่างทดสอบ แล้วคืนข้อมูลตัวอย่างเดิมเมื่อจบ
+@pytest.fixture
+def graph():
+    saved = (cafe_routes.G.copy(), dict(cafe_routes.dic_cafe), dict(cafe_routes.positions))
+    yield make_graph(60, degree=3, cafe_ratio=0.3, seed=7)
+    if cafe_routes.route_store is not None:
+        cafe_routes.route_store.close()
+        cafe_routes.route_store = None
+    use_graph(saved[0])
+    cafe_routes.dic_cafe.clear()
+    cafe_routes.dic_cafe.update(saved[1])
+    cafe_routes.positions.clear()
+    cafe_routes.positions.update(saved[2])
+
+
+@pytest.mark.parametrize("backend", ["nx", "csr", "ch"])
+@pytest.mark.parametrize("method", sorted(cafe_routes.SOLVERS))
+def test_solvers_match_networkx(graph, backend, method):
+    use_graph(graph, backend)
+    rng = random.Random(1)
+    for _ in range(3):
+        start, destinations = sample_query(graph, rng, 5)
+        path, distance = cafe_routes.find_best_shortest_path(start, destinations, method=method, use_cache=False, workers=1)
+        assert_valid_path(graph, path, distance, start, destinations)
+        expected = best_tour(graph, start, destinations)
+        if method == "heuristic":
+            assert distance >= expected
+        else:
+            assert distance == expected
+
+
+def test_contraction_hierarchy_matches_dijkstra(graph):
+    hierarchy = ContractionHierarchy.build(graph)
+    nodes = random.Random(2).sample(sorted(graph.nodes), 10)
+    table = hierarchy.distance_table(nodes)
+    for i, u in enumerate(nodes):
+        lengths = nx.single_source_dijkstra_path_length(graph, u)
+        for j, v in enumerate(nodes):
+            assert table[i][j] == lengths[v]
+            distance, path = hierarchy.shortest_path(u, v)
+            assert distance == lengths[v]
+            assert nx.path_weight(graph, path, weight="weight") == lengths[v]
+
+
+# แก้ไขเส้นทางแบบสุ่ม (ยาวขึ้น/สั้นลง/ลบ/เพิ่ม) แล้วคำตอบจากแคช (leg_cache ที่ซ่อมแล้ว, route_store, CSR, CH)
+# ต้องเท่ากับการคำนวณใหม่ทั้งหมดด้วย networkx
+@pytest.mark.parametrize("backend", ["nx", "csr", "ch"])
+def test_edge_updates_match_recompute(graph, backend, tmp_path):
+    use_graph(graph, backend)
+    cafe_routes.open_route_store(str(tmp_path / "routes.db"))
+    rng = random.Random(3)
+    queries = [sample_query(graph, rng, 3) for _ in range(6)]
+    for start, destinations in queries:
+        cafe_routes.find_best_shortest_path(start, destinations, method="brute-force")
+
+    nodes = sorted(graph.nodes)
+    for _ in range(20):
+        change = rng.random()
+        if change < 0.25:
+            u, v = rng.choice(sorted(cafe_routes.G.edges))
+            cafe_routes.remove_edge(u, v)
+        elif change < 0.4:
+            u, v = rng.sample(nodes, 2)
+            cafe_routes.update_edge(u, v, rng.randint(1, 30))
+        else:
+            u, v = rng.choice(sorted(cafe_routes.G.edges))
+            cafe_routes.update_edge(u, v, max(1, cafe_routes.G[u][v]["weight"] + rng.choice([-8, -3, 4, 10, 2.5])))
+
+        current = cafe_routes.G.copy()
+        rows = cafe_routes.leg_cache._rows.values()
+        assert cafe_routes.leg_cache.entries == sum(len(dist) for _, dist, _ in rows)
+        for start, destinations in queries:
+            expected = best_tour(current, start, destinations)
+            if expected is None:
+                with pytest.raises(nx.NetworkXNoPath):
+                    cafe_routes.find_best_shortest_path(start, destinations, method="brute-force")
+                continue
+            path, distance = cafe_routes.find_best_shortest_path(start, destinations, method="brute-force")
+            assert distance == pytest.approx(expected)
+            assert_valid_path(current, path, distance, start, destinations)
+
+
+@pytest.mark.parametrize("backend", ["nx", "csr"])
+def test_nearby_cafes_exclude_origin(graph, backend):
+    use_graph(graph, backend)
+    cafes = set(cafe_routes.dic_cafe)
+    for start in sorted(cafes)[:5]:
+        found = cafe_routes.find_nearby_cafes(start, 4)
+        lengths = nx.single_source_dijkstra_path_length(graph, start)
+        expected = sorted(lengths[cafe] for cafe in cafes if cafe != start)[:4]
+        assert start not in [cafe for cafe, _ in found]
+        assert [distance for _, distance in found] == expected
+
+
+# solve_many สร้างตารางและแก้ลำดับใน worker ผลต้องเท่ากับการหาทีละคำขอ รวมคำขอซ้ำ/โหนดไม่มีอยู่
+@pytest.mark.parametrize("backend", ["nx", "csr", "ch"])
+def test_solve_many_matches_single_queries(graph, backend):
+    use_graph(graph, backend)
+    rng = random.Random(4)
+    queries = [sample_query(graph, rng, rng.randint(2, 5)) for _ in range(12)]
+    queries += [queries[0], ("missing", ["0"])]
+    results = dict(cafe_routes.solve_many(queries, workers=1, use_cache=False, window=5))
+    assert sorted(results) == list(range(len(queries)))
+    assert isinstance(results[len(queries) - 1], nx.NodeNotFound)
+    for i, (start, destinations) in enumerate(queries[:-1]):
+        path, distance = results[i]
+        assert_valid_path(graph, path, distance, start, destinations)
+        assert distance == best_tour(graph, start, destinations)
+
+
+# ตัวนับ revision ต้องเพิ่มเสมอ แม้ load_cafes/use_graph จะ G.clear() ทำให้ข้อมูลที่ key ด้วย revision สร้างใหม่
+def test_revision_survives_graph_reload(graph):
+    use_graph(graph)
+    before = cafe_routes.graph_revision()
+    u, v = next(iter(graph.edges))
+    cafe_routes.update_edge(u, v, 99)
+    edited = cafe_routes.graph_revision()
+    use_graph(graph)
+    assert before < edited < cafe_routes.graph_revision()
+    assert cafe_routes.cafe_index()["key"][0] == cafe_routes.graph_revision()
+
+
+# leg_cache จำกัดตามจำนวนโหนดที่เก็บรวม ไม่ใช่จำนวนแถว
+def test_leg_cache_bounded_by_entries(graph):
+    cache = cafe_routes.LegCache(max_entries=150)
+    rows = {node: nx.dijkstra_predecessor_and_distance(graph, node) for node in sorted(graph.nodes)[:5]}
+    for node, row in rows.items():
+        cache.put_legs({node: row})
+        assert cache.entries == sum(len(cache.row(source)[1]) for source in rows if cache.row(source))
+    assert cache.entries <= 150
+    assert cache.row(sorted(rows)[-1]) is not None and cache.row(sorted(rows)[0]) is None
+
+
+def write_graph(graph, folder):
+    nodes, edges = folder / "nodes.csv", folder / "edges.csv"
+    with open(nodes, "w", encoding="utf-8") as f:
+        f.write("id,name,x,y\n")
+        f.writelines(f"{n},{data.get('name', '')},{data['pos'][0]},{data['pos'][1]}\n" for n, data in graph.nodes(data=True))
+    with open(edges, "w", encoding="utf-8") as f:
+        f.write("source,target,weight\n")
+        f.writelines(f"{u},{v},{w}\n" for u, v, w in graph.edges(data="weight"))
+    return str(nodes), str(edges)
+
+
+# โหลดจาก snapshot: ใช้กราฟ CSR ทันทีโดยยังไม่สร้าง G จนกว่าจะต้องแก้เส้นทาง
+def test_snapshot_load_uses_csr_without_networkx(graph, tmp_path):
+    nodes, edges = write_graph(graph, tmp_path)
+    snapshot = str(tmp_path / "graph.snap")
+    cafe_routes.load_cafes(nodes, edges, snapshot)
+    cafe_routes.load_cafes(nodes, edges, snapshot)
+    assert isinstance(cafe_routes.routing_graph(), cafe_routes.CSRGraph)
+    assert len(cafe_routes.G) == 0
+    assert cafe_routes.dic_cafe == {n: name for n, name in graph.nodes(data="name") if name}
+
+    rng = random.Random(5)
+    start, destinations = sample_query(graph, rng, 4)
+    assert cafe_routes.find_best_shortest_path(start, destinations)[1] == best_tour(graph, start, destinations)
+
+    u, v = next(iter(graph.edges))
+    cafe_routes.update_edge(u, v, 1)
+    edited = graph.copy()
+    edited[u][v]["weight"] = 1
+    assert nx.utils.graphs_equal(cafe_routes.G, edited)
+    assert cafe_routes.find_best_shortest_path(start, destinations)[1] == best_tour(edited, start, destinations)
+
+
+# 🔹 graph_loader: id ที่เป็นเลข 0 ใน JSONL และเส้นซ้ำ
+def test_loader_accepts_integer_zero_ids(tmp_path):
+    nodes, edges = tmp_path / "nodes.jsonl", tmp_path / "edges.jsonl"
+    nodes.write_text('{"id": 0, "name": "Zero"}\n{"id": 1}\n', encoding="utf-8")
+    edges.write_text('{"source": 0, "target": 1, "weight": 4}\n', encoding="utf-8")
+    graph = graph_loader.load_graph(str(nodes), str(edges))
+    assert graph.nodes["0"]["name"] == "Zero" and graph["0"]["1"]["weight"] == 4
+    assert list(graph_loader.load_csr(str(nodes), str(edges)).edges()) == [("0", "1", 4)]
+
+
+@pytest.mark.parametrize("second", ["P,Q,9", "Q,P,9"])
+def test_loader_rejects_duplicate_edges(tmp_path, second):
+    nodes, edges = tmp_path / "nodes.csv", tmp_path / "edges.csv"
+    nodes.write_text("id\nP\nQ\n", encoding="utf-8")
+    edges.write_text(f"source,target,weight\nP,Q,1\n{second}\n", encoding="utf-8")
+    for load in (graph_loader.load_graph, graph_loader.load_csr):
+        with pytest.raises(ValueError, match="duplicate edge"):
+            load(str(nodes), str(edges))
+
+
+# 🔹 แบ่งงานไรเดอร์: จุดแวะที่ห่างกัน 0 (weight 0) ต้องไม่ทำให้ได้ medoid ซ้ำหรือกลุ่มว่างที่ทำให้พัง
+def test_cluster_stops_zero_distance_stops():
+    dist = [[0, 5, 5, 9], [5, 0, 0, 9], [5, 0, 0, 9], [9, 9, 9, 0]]
+    groups = cafe_routes.cluster_stops(dist, 0, [1, 2, 3], 3)
+    assert len(groups) == 3
+    assert sorted(stop for group in groups for stop in group) == [1, 2, 3]
+
+
+def test_courier_routes_cover_every_stop(graph):
+    use_graph(graph)
+    start, destinations = sample_query(graph, random.Random(6), 8)
+    routes = cafe_routes.find_courier_routes(start, destinations, 3, workers=1)
+    assert len(routes) == 3
+    for path, distance in routes:
+        assert_valid_path(graph, path, distance, start, [])
+    assert set(destinations) - {start} <= {node for path, _ in routes for node in path}
+    assert cafe_routes.find_courier_routes(start, [start], 2) == [([start], 0), ([start], 0)]
+    with pytest.raises(ValueError):
+        cafe_routes.find_courier_routes(start, destinations, 0)
+
+
+# 🔹 method=auto: คำตอบที่ดีที่สุดแน่นอนถึง BRANCH_AND_BOUND_LIMIT จุด เกินนั้นจึงใช้ heuristic
+def test_auto_method_thresholds():
+    pick = cafe_routes.pick_method
+    assert pick("auto", cafe_routes.BRUTE_FORCE_LIMIT) == "brute-force"
+    assert pick("auto", cafe_routes.HELD_KARP_LIMIT) == "held-karp"
+    assert pick("auto", cafe_routes.HELD_KARP_LIMIT + 1) == "branch-and-bound"
+    assert pick("auto", cafe_routes.BRANCH_AND_BOUND_LIMIT) == "branch-and-bound"
+    assert pick("auto", cafe_routes.BRANCH_AND_BOUND_LIMIT + 1) == "heuristic"
+    with pytest.raises(ValueError):
+        pick("fastest", 3)
+
+
+# 🔹 บริการ HTTP: ผลเส้นทางตรงกับ networkx, คำขอซ้ำใช้แคช และปฏิเสธคำขอที่ทำให้ worker ค้าง
+def test_route_service_dispatch(graph):
+    use_graph(graph)
+    start, destinations = sample_query(graph, random.Random(8), 4)
+    too_many = sorted(node for node in graph.nodes if node != start)[:cafe_routes.BRANCH_AND_BOUND_LIMIT + 1]
+
+    async def run():
+        service = RouteService(workers=1, timeout=30)
+        await service.start()
+        try:
+            target = f"/route?start={start}&destinations={','.join(destinations)}"
+            first = await service.dispatch("GET", target, b"")
+            again = await service.dispatch("POST", "/route", json.dumps({"start": start, "destinations": destinations}).encode())
+            rejected = [
+                await service.dispatch("GET", f"{target}&method=parallel", b""),
+                await service.dispatch("GET", f"/route?start={start}&destinations={','.join(too_many)}&method=branch-and-bound", b""),
+                await service.dispatch("POST", "/route", b"[1, 2]"),
+            ]
+            missing = await service.dispatch("GET", "/nowhere", b"")
+            return first, again, rejected, missing, service.stats()
+        finally:
+            service.close()
+
+    first, again, rejected, missing, stats = asyncio.run(run())
+    status, body = first
+    assert status == 200
+    assert_valid_path(graph, body["path"], body["distance"], start, destinations)
+    assert body["distance"] == pytest.approx(best_tour(graph, start, destinations))
+    assert again == first
+    assert stats["computed"] == 1 and stats["cached"] == 1
+    assert [status for status, _ in rejected] == [400, 400, 400]
+    assert missing[0] == 404
+
+
+# 🔹 ตัวแก้ลองทุกลำดับรายงานความคืบหน้าและหยุดกลางทางได้ (ใช้ในหน้าต่าง Tk)
+def test_brute_force_progress_and_cancel(graph):
+    use_graph(graph)
+    start, destinations = sample_query(graph, random.Random(9), 5)
+    matrix = cafe_routes.DistanceMatrix(graph, [start, *destinations])
+    first, stops = cafe_routes.route_stops(matrix, start, destinations)
+
+    progress = {"explored": 0}
+    order, distance = cafe_routes.solve_brute_force(matrix.dist, first, stops, progress=progress)
+    assert progress["explored"] == 120
+    assert distance == pytest.approx(best_tour(graph, start, destinations))
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(cafe_routes.Cancelled):
+        cafe_routes.solve_brute_force(matrix.dist, first, stops, cancel=cancel)
+
+    path, distance = cafe_routes.find_best_shortest_path(start, destinations, method="brute-force", progress=progress)
+    assert_valid_path(graph, path, distance, start, destinations)
+
+
+# 🔹 RouteSession: เพิ่ม/ลบจุดแวะทีละจุดแล้วเส้นทางยังถูกต้อง และ resolve ได้คำตอบที่ดีที่สุด
+def test_route_session_edits(graph):
+    use_graph(graph)
+    start, destinations = sample_query(graph, random.Random(10), 6)
+    session = cafe_routes.RouteSession(start, destinations[:3])
+    assert_valid_path(graph, *session.route(), start, destinations[:3])
+
+    for stop in destinations[3:]:
+        path, distance = session.add_stop(stop)
+    assert_valid_path(graph, path, distance, start, destinations)
+    assert session.add_stop(start) == session.route()
+
+    path, distance = session.remove_stop(destinations[0])
+    assert_valid_path(graph, path, distance, start, destinations[1:])
+    assert sorted(session.destinations) == sorted(destinations[1:])
+    with pytest.raises(ValueError):
+        session.remove_stop(destinations[0])
+
+    path, distance = session.resolve()
+    assert distance == pytest.approx(best_tour(graph, start, destinations[1:]))
+
+
+# 🔹 คาเฟ่ที่ไปถึงได้ภายในรัศมี: ระยะทางตรงกับ Dijkstra ที่มี cutoff ทั้งสอง backend
+@pytest.mark.parametrize("backend", ["nx", "csr"])
+def test_reachable_cafes_match_dijkstra(graph, backend):
+    use_graph(graph, backend)
+    origins = sorted(graph.nodes)[:3]
+    radius = 40
+    results = cafe_routes.find_reachable_cafes([*origins, origins[0]], radius)
+    assert list(results) == origins
+    for origin, found in results.items():
+        expected = nx.single_source_dijkstra_path_length(graph, origin, cutoff=radius)
+        assert found.distances == pytest.approx(expected)
+        assert list(found.distances.values()) == sorted(found.distances.values())
+        assert all(graph.has_edge(u, v) for u, v in found.edges())
+        cafes = found.cafes(cafe_routes.dic_cafe)
+        assert cafes and all(node != origin and cafe_routes.dic_cafe.get(node) for node, _ in cafes)
+
+
+# 🔹 batch CLI: อ่าน JSONL เขียนผลทีละบรรทัด บรรทัดที่ผิดรูปแบบ/หาเส้นทางไม่ได้กลายเป็น error ตาม id
+def test_batch_cli_writes_results_and_errors(graph, tmp_path):
+    nodes, edges = write_graph(graph, tmp_path)
+    rng = random.Random(11)
+    queries = [sample_query(graph, rng, 3) for _ in range(4)]
+    lines = [json.dumps({"id": f"q{i}", "start": start, "destinations": destinations}) for i, (start, destinations) in enumerate(queries)]
+    lines += ["not json", json.dumps({"id": "bad", "start": "A", "destinations": "DI"}), json.dumps({"id": "lost", "start": "nowhere", "destinations": [queries[0][0]]})]
+    source, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    batch_routes.main([str(source), "-o", str(output), "--nodes", nodes, "--edges", edges, "--workers", "1"])
+    results = {result["id"]: result for result in map(json.loads, output.read_text(encoding="utf-8").splitlines())}
+    assert set(results) == {"q0", "q1", "q2", "q3", 5, 6, "lost"}
+    for i, (start, destinations) in enumerate(queries):
+        result = results[f"q{i}"]
+        assert_valid_path(graph, result["path"], result["distance"], start, destinations)
+        assert result["distance"] == pytest.approx(best_tour(graph, start, destinations))
+    assert all("error" in results[key] for key in (5, 6, "lost"))